@@ -0,0 +1,495 @@
+#!/usr/bin/env python3
+"""
+Benchmarks del sistema de placas bolivianas
+"""
+
+import argparse
+import csv
+import os
+import resource
+import statistics
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import cv2
+
+from lib.image_loader import iter_image_files
+
+
+def list_images(images_dir):
+    """Lista las imágenes del directorio ordenadas por nombre"""
+    return sorted(iter_image_files(images_dir), key=lambda p: p.name.lower())
+
+
+def run_isolated(func, *args):
+    """Ejecuta func en un proceso nuevo para medir su RSS pico por separado"""
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+        return executor.submit(func, *args).result()
+
+
+def _decode_worker(mode, paths):
+    """Decodifica todas las imágenes con el modo indicado. Retorna (segundos, RSS pico en KB)"""
+    from lib.filters import get_grayscale
+    from lib.image_loader import choose_reduction, load_image, read_image_size
+
+    start = time.perf_counter()
+    for path in paths:
+        if mode == 'imread':
+            # Flujo original: resolución completa y conversión a gris posterior
+            get_grayscale(cv2.imread(str(path)))
+        else:
+            reduction = choose_reduction(read_image_size(path))
+            load_image(path, grayscale=True, reduction=reduction)
+    elapsed = time.perf_counter() - start
+    return elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def bench_decode(args):
+    """Compara cv2.imread completo contra la decodificación reducida con mmap"""
+    paths = list_images(args.images_dir)
+    if not paths:
+        print("❌ No se encontraron imágenes")
+        return
+
+    print(f"📷 {len(paths)} imágenes en {args.images_dir}")
+    print("-" * 60)
+
+    results = {}
+    for mode in ['imread', 'reduced']:
+        elapsed, rss_kb = run_isolated(_decode_worker, mode, paths)
+        results[mode] = (elapsed, rss_kb)
+        print(f"{mode:10}: {elapsed * 1000 / len(paths):8.1f} ms/imagen   RSS pico {rss_kb / 1024:8.1f} MB")
+
+    base_time, base_rss = results['imread']
+    new_time, new_rss = results['reduced']
+    print("-" * 60)
+    print(f"⚡ Aceleración: {base_time / new_time:.2f}x")
+    print(f"💾 Reducción de RSS: {(base_rss - new_rss) / 1024:.1f} MB")
+
+
+def load_expected_plates(path):
+    """Lee un CSV con columnas file,plate. Retorna {nombre de archivo: placa sin espacios}"""
+    with open(path, newline='', encoding='utf-8') as f:
+        return {row['file']: row['plate'].replace(' ', '').upper() for row in csv.DictReader(f)}
+
+
+def bench_ocr(args):
+    """Compara los modos de advanced_ocr_scan: tiempo, llamadas a Tesseract por imagen y aciertos"""
+    from bolivia_final import OCR_MODES, advanced_ocr_scan
+    from lib.image_loader import load_image
+
+    paths = list_images(args.images_dir)
+    if not paths:
+        print("❌ No se encontraron imágenes")
+        return
+    expected = load_expected_plates(args.labels) if args.labels else {}
+    images = [(path.name, load_image(path)) for path in paths]
+
+    print(f"📷 {len(images)} imágenes en {args.images_dir}")
+    print("-" * 60)
+    for mode in args.modes or OCR_MODES:
+        detected = correct = calls = 0
+        start = time.perf_counter()
+        for name, image in images:
+            stats = {}
+            plate = advanced_ocr_scan(image, stats, mode=mode)
+            calls += stats.get('ocr_calls', 0)
+            detected += bool(plate)
+            correct += bool(plate) and expected.get(name) == plate
+        elapsed = time.perf_counter() - start
+        line = (f"{mode:8}: {elapsed * 1000 / len(images):8.1f} ms/imagen   "
+                f"{calls / len(images):5.1f} llamadas OCR/imagen   detectadas {detected}/{len(images)}")
+        if expected:
+            line += f"   correctas {correct}/{len(expected)}"
+        print(line)
+
+
+def bench_deskew(args):
+    """Tiempo de enhanced_preprocessing con Hough en la imagen completa contra el enderezado por región"""
+    from lib.filters import (correct_skew_hough, detect_plate_contours, enhanced_preprocessing,
+                             get_grayscale, reset_skew_cache)
+    from lib.image_loader import load_image
+
+    paths = list_images(args.images_dir)
+    if not paths:
+        print("❌ No se encontraron imágenes")
+        return
+
+    # La región de la placa ya la calcula el escaneo: no entra en el tiempo medido
+    samples = []
+    for path in paths:
+        image = load_image(path)
+        samples.append((get_grayscale(image), detect_plate_contours(image)))
+
+    variants = {
+        'hough': lambda gray, region: enhanced_preprocessing(gray, deskew=correct_skew_hough),
+        'roi': lambda gray, region: enhanced_preprocessing(gray, region),
+        'roi+cámara': lambda gray, region: enhanced_preprocessing(gray, region, camera='benchmark'),
+    }
+
+    print(f"📷 {len(samples)} imágenes en {args.images_dir} ({args.repeat} repeticiones)")
+    print("-" * 60)
+    timings = {}
+    for name, preprocess in variants.items():
+        reset_skew_cache()
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for gray, region in samples:
+                preprocess(gray, region)
+        timings[name] = (time.perf_counter() - start) * 1000 / (len(samples) * args.repeat)
+        print(f"{name:10}: {timings[name]:8.2f} ms/imagen")
+
+    print("-" * 60)
+    for name in ('roi', 'roi+cámara'):
+        print(f"⚡ {name}: {timings['hough'] - timings[name]:.2f} ms ahorrados por imagen")
+
+
+def bench_alloc(args):
+    """Memoria reservada y variación de latencia por frame: filtros funcionales contra Preprocessor"""
+    from lib.filters import enhanced_preprocessing, get_grayscale, remove_noise, thresholding
+    from lib.image_loader import load_image
+    from lib.preprocessor import Preprocessor
+
+    paths = list_images(args.images_dir)
+    if not paths:
+        print("❌ No se encontraron imágenes")
+        return
+
+    # Frames de tamaño constante, como los de una cámara fija
+    size = (args.width, args.height)
+    frames = [cv2.resize(load_image(path), size, interpolation=cv2.INTER_AREA) for path in paths]
+
+    preprocessor = Preprocessor()
+    variants = {
+        'funciones': lambda frame: (remove_noise(thresholding(get_grayscale(frame))),
+                                    enhanced_preprocessing(frame, camera='benchmark')),
+        'preprocessor': lambda frame: (preprocessor.process(frame),
+                                       preprocessor.enhanced(frame, camera='benchmark')),
+    }
+
+    print(f"🎞️ {args.frames} frames de {size[0]}x{size[1]}")
+    print("-" * 60)
+    for name, process in variants.items():
+        # Calentamiento: reserva de búferes y ángulo de la cámara
+        for frame in frames * 2:
+            process(frame)
+
+        latencies = []
+        for i in range(args.frames):
+            start = time.perf_counter()
+            process(frames[i % len(frames)])
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        tracemalloc.start()
+        allocated = []
+        for i in range(args.frames):
+            baseline = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            process(frames[i % len(frames)])
+            allocated.append(tracemalloc.get_traced_memory()[1] - baseline)
+        tracemalloc.stop()
+
+        latencies.sort()
+        p50 = latencies[len(latencies) // 2]
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(f"{name:12}: p50 {p50:6.2f} ms   p99 {p99:6.2f} ms   desv {statistics.pstdev(latencies):5.2f} ms   "
+              f"reservado {statistics.mean(allocated) / 1024:8.1f} KB/frame")
+
+
+def bench_batch(args):
+    """Costo por recorte de la conversión a gris individual contra la conversión de la pila en una llamada"""
+    import numpy as np
+    from lib.filters import get_grayscale, get_grayscale_batch
+    from lib.image_loader import load_image
+
+    paths = list_images(args.images_dir)
+    if not paths:
+        print("❌ No se encontraron imágenes")
+        return
+
+    # Recortes del tamaño de una placa tomados de las imágenes disponibles
+    size = (args.width, args.height)
+    crops = [cv2.resize(load_image(path), size, interpolation=cv2.INTER_AREA) for path in paths]
+
+    def single(stack):
+        for crop in stack:
+            get_grayscale(crop)
+
+    def batch(stack):
+        # Salida reutilizada entre lotes, como en un flujo continuo
+        get_grayscale_batch(stack, out=outputs.setdefault(stack.shape, np.empty(stack.shape[:3], np.uint8)))
+
+    outputs = {}
+
+    print(f"🔲 Recortes de {size[0]}x{size[1]}: conversión a gris")
+    print("-" * 60)
+    for n in args.sizes:
+        stack = np.stack([crops[i % len(crops)] for i in range(n)])
+        repeat = max(1, args.crops // n)
+        timings = {}
+        for name, process in (('individual', single), ('lote', batch)):
+            process(stack)
+            start = time.perf_counter()
+            for _ in range(repeat):
+                process(stack)
+            timings[name] = (time.perf_counter() - start) * 1e6 / (repeat * n)
+        print(f"N={n:4}: individual {timings['individual']:8.1f} µs/recorte   "
+              f"lote {timings['lote']:8.1f} µs/recorte   ({timings['individual'] / timings['lote']:.2f}x)")
+
+
+def bench_decoder(args):
+    """Compara las tablas fijas con el decodificador entrenado sobre lecturas etiquetadas"""
+    from lib.plate_decoder import PlateDecoder, correct_with_tables, load_labeled_reads
+
+    pairs = load_labeled_reads(args.labels)
+    if not pairs:
+        print("❌ No hay lecturas etiquetadas")
+        return
+
+    # 80% para entrenar, 20% para evaluar
+    split = int(len(pairs) * 0.8)
+    train_pairs, test_pairs = pairs[:split], pairs[split:] or pairs
+
+    decoders = {
+        'tablas': lambda read: correct_with_tables(read),
+        'tablas-ML': _decoder_fn(PlateDecoder.from_tables()),
+        'entrenado': _decoder_fn(PlateDecoder.from_tables().train(train_pairs)),
+    }
+
+    print(f"📋 {len(train_pairs)} lecturas de entrenamiento, {len(test_pairs)} de evaluación")
+    print("-" * 60)
+    for name, decode in decoders.items():
+        correct = sum(1 for truth, read in test_pairs if decode(read) == truth.replace(' ', '').upper())
+        print(f"{name:10}: {correct * 100 / len(test_pairs):6.1f}% placas correctas")
+
+    if args.save:
+        PlateDecoder.from_tables().train(pairs).save(args.save)
+        print(f"💾 Modelo entrenado con todas las lecturas guardado en: {args.save}")
+
+
+def _decoder_fn(decoder):
+    def decode(read):
+        result = decoder.decode(read)
+        return result[0] if result else None
+    return decode
+
+
+def _threads_worker(mode, workers, paths, batch):
+    """Escanea las imágenes con la configuración de hilos del modo indicado.
+    Retorna los segundos totales (lote) o la latencia por imagen en segundos (una a una).
+    """
+    from bolivia_final import advanced_ocr_scan
+    from lib import exec_config
+    from lib.image_loader import load_image
+
+    if mode == 'default':
+        os.environ.pop('OMP_THREAD_LIMIT', None)
+        config = exec_config.plan('default')._replace(workers=workers)
+    else:
+        config = exec_config.with_workers(exec_config.plan(mode), workers)
+    exec_config.apply(config)
+    images = [load_image(path) for path in paths]
+
+    if not batch:
+        latencies = []
+        for image in images:
+            start = time.perf_counter()
+            advanced_ocr_scan(image)
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=config.workers, mp_context=get_context('spawn'),
+                             initializer=exec_config.apply, initargs=(config,)) as executor:
+        list(executor.map(advanced_ocr_scan, images))
+    return time.perf_counter() - start
+
+
+def bench_threads(args):
+    """Configuración de hilos por defecto contra la elegida por lib.exec_config, en lote y una a una"""
+    from lib.exec_config import available_cpus, cgroup_cpu_limit
+
+    paths = list_images(args.images_dir)
+    if not paths:
+        print("❌ No se encontraron imágenes")
+        return
+    batch_paths = paths * args.repeat
+    cpus = available_cpus()
+    limit = cgroup_cpu_limit()
+
+    print(f"🧵 {cpus} núcleos disponibles (os.cpu_count: {os.cpu_count()}, cuota del cgroup: "
+          f"{f'{limit:g}' if limit is not None else 'sin límite'})")
+    print(f"📷 {len(paths)} imágenes en {args.images_dir}")
+    print("-" * 60)
+
+    # Lote: tantos procesos como núcleos, con y sin limitar los hilos de cada uno
+    results = {}
+    for mode in ['default', 'throughput']:
+        elapsed = run_isolated(_threads_worker, mode, cpus, batch_paths, True)
+        results[mode] = elapsed
+        print(f"lote   {mode:10}: {len(batch_paths) / elapsed:8.1f} imágenes/s")
+    print(f"⚡ Rendimiento: {results['default'] / results['throughput']:.2f}x")
+    print("-" * 60)
+
+    # Una imagen a la vez
+    latencies = {}
+    for mode in ['default', 'latency']:
+        samples = run_isolated(_threads_worker, mode, 1, paths * args.repeat, False)
+        latencies[mode] = statistics.median(samples)
+        print(f"latencia {mode:8}: {latencies[mode] * 1000:8.1f} ms/imagen (mediana)")
+    print(f"⚡ Latencia: {latencies['default'] / latencies['latency']:.2f}x")
+
+
+def bench_presence(args):
+    """Tasa de rechazo del pre-filtro de presencia y falsos negativos sobre un conjunto etiquetado"""
+    from lib.image_loader import load_image
+    from lib.presence import PRESENCE_THRESHOLD, presence_features, presence_score
+
+    expected = load_expected_plates(args.labels)
+    paths = [path for path in list_images(args.images_dir) if path.name in expected]
+    if not paths:
+        print("❌ Ninguna imagen del directorio aparece en las etiquetas")
+        return
+
+    scores = []
+    start = time.perf_counter()
+    for path in paths:
+        scores.append((bool(expected[path.name]), presence_score(presence_features(load_image(path)))))
+    elapsed = time.perf_counter() - start
+
+    positives = sum(has_plate for has_plate, _ in scores)
+    negatives = len(scores) - positives
+    print(f"📷 {len(scores)} imágenes etiquetadas: {positives} con placa, {negatives} sin placa")
+    print(f"⏱️ {elapsed * 1000 / len(scores):.1f} ms/imagen (incluye la decodificación)")
+    print("-" * 60)
+    for threshold in args.thresholds or [PRESENCE_THRESHOLD]:
+        rejected = sum(score < threshold for _, score in scores)
+        missed = sum(has_plate and score < threshold for has_plate, score in scores)
+        filtered = sum(not has_plate and score < threshold for has_plate, score in scores)
+        line = f"umbral {threshold:4.2f}: rechazadas {rejected / len(scores) * 100:5.1f}%"
+        if positives:
+            line += f"   falsos negativos {missed / positives * 100:5.1f}%"
+        if negatives:
+            line += f"   vacías filtradas {filtered / negatives * 100:5.1f}%"
+        print(line)
+
+
+def load_expected_boxes(path):
+    """Lee un CSV con columnas file,x,y,w,h (fila de caracteres). Retorna {nombre de archivo: (x, y, w, h)}"""
+    with open(path, newline='', encoding='utf-8') as f:
+        return {row['file']: tuple(int(row[key]) for key in 'xywh') for row in csv.DictReader(f)}
+
+
+def _coverage(box, region):
+    """Fracción del área de `box` que cae dentro de `region`"""
+    x0, y0 = max(box[0], region[0]), max(box[1], region[1])
+    x1 = min(box[0] + box[2], region[0] + region[2])
+    y1 = min(box[1] + box[3], region[1] + region[3])
+    return max(x1 - x0, 0) * max(y1 - y0, 0) / max(box[2] * box[3], 1)
+
+
+def bench_localize(args):
+    """Tiempo y recall de cada localizador de lib.localization.LOCALIZERS"""
+    from lib.image_loader import load_image
+    from lib.localization import LOCALIZERS
+
+    localizers = {name: LOCALIZERS[name] for name in args.localizers or LOCALIZERS}
+    paths = list_images(args.images_dir)
+    if not paths:
+        print("❌ No se encontraron imágenes")
+        return
+    boxes = load_expected_boxes(args.boxes) if args.boxes else {}
+    images = [(path.name, load_image(path)) for path in paths]
+
+    print(f"📷 {len(images)} imágenes en {args.images_dir}")
+    print("-" * 60)
+    results = {}
+    for name, localize in localizers.items():
+        found = covered = 0
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            regions = [(image_name, localize(image)) for image_name, image in images]
+        elapsed = (time.perf_counter() - start) / args.repeat
+        for image_name, region in regions:
+            found += region is not None
+            # Acierto: la región contiene la fila de caracteres etiquetada
+            covered += (region is not None and image_name in boxes
+                        and _coverage(boxes[image_name], region) >= 0.9)
+        results[name] = elapsed
+        line = (f"{name:8}: {elapsed * 1000 / len(images):8.2f} ms/imagen   "
+                f"localizadas {found}/{len(images)}")
+        if boxes:
+            line += f"   recall {covered}/{len(boxes)} ({covered / len(boxes) * 100:.0f}%)"
+        print(line)
+    if 'contours' in results and len(results) > 1:
+        print("-" * 60)
+        for name, elapsed in results.items():
+            if name != 'contours':
+                print(f"⚡ {name} contra contours: {results['contours'] / elapsed:.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks del sistema de placas bolivianas")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    decode = subparsers.add_parser('decode', help="Tiempo de decodificación y RSS")
+    decode.add_argument('images_dir', nargs='?', default='../images')
+    decode.set_defaults(func=bench_decode)
+
+    ocr = subparsers.add_parser('ocr', help="Tiempo, llamadas y aciertos de los modos de OCR")
+    ocr.add_argument('images_dir', nargs='?', default='../images')
+    ocr.add_argument('--labels', default=None, help="CSV con columnas file,plate")
+    ocr.add_argument('--modes', nargs='+', default=None, help="Modos a comparar (por defecto todos)")
+    ocr.set_defaults(func=bench_ocr)
+
+    deskew = subparsers.add_parser('deskew', help="Tiempo de corrección de inclinación en enhanced_preprocessing")
+    deskew.add_argument('images_dir', nargs='?', default='../images')
+    deskew.add_argument('--repeat', type=int, default=5)
+    deskew.set_defaults(func=bench_deskew)
+
+    alloc = subparsers.add_parser('alloc', help="Memoria reservada y variación de latencia por frame")
+    alloc.add_argument('images_dir', nargs='?', default='../images')
+    alloc.add_argument('--frames', type=int, default=500)
+    alloc.add_argument('--width', type=int, default=640)
+    alloc.add_argument('--height', type=int, default=480)
+    alloc.set_defaults(func=bench_alloc)
+
+    batch = subparsers.add_parser('batch', help="Costo por recorte de la conversión a gris por lotes")
+    batch.add_argument('images_dir', nargs='?', default='../images')
+    batch.add_argument('--sizes', type=int, nargs='+', default=[1, 16, 256])
+    batch.add_argument('--crops', type=int, default=2048, help="Recortes procesados por tamaño de lote")
+    batch.add_argument('--width', type=int, default=240)
+    batch.add_argument('--height', type=int, default=80)
+    batch.set_defaults(func=bench_batch)
+
+    decoder = subparsers.add_parser('decoder', help="Precisión de la corrección de lecturas OCR")
+    decoder.add_argument('labels', help="CSV con columnas truth,read")
+    decoder.add_argument('--save', default=None, help="Guardar el modelo entrenado (JSON)")
+    decoder.set_defaults(func=bench_decoder)
+
+    presence = subparsers.add_parser('presence', help="Rechazos y falsos negativos del pre-filtro de presencia")
+    presence.add_argument('labels', help="CSV con columnas file,plate (plate vacía = sin placa)")
+    presence.add_argument('images_dir', nargs='?', default='../images')
+    presence.add_argument('--thresholds', type=float, nargs='+', default=None)
+    presence.set_defaults(func=bench_presence)
+
+    localize = subparsers.add_parser('localize', help="Tiempo y recall de los localizadores de placa")
+    localize.add_argument('images_dir', nargs='?', default='../images')
+    localize.add_argument('--localizers', nargs='+', default=None, help="Localizadores a comparar (por defecto todos)")
+    localize.add_argument('--boxes', default=None, help="CSV con columnas file,x,y,w,h de la fila de caracteres")
+    localize.add_argument('--repeat', type=int, default=10)
+    localize.set_defaults(func=bench_localize)
+
+    threads = subparsers.add_parser('threads', help="Hilos de Tesseract/OpenCV por defecto contra lib.exec_config")
+    threads.add_argument('images_dir', nargs='?', default='../images')
+    threads.add_argument('--repeat', type=int, default=3, help="Veces que se procesa cada imagen")
+    threads.set_defaults(func=bench_threads)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,68 +3,50 @@
 Sistema de detección de placas bolivianas - Solo formato 4números+3letras
 """
 
+import argparse
 import os
 import cv2
 import datetime
 import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from lib.filters import (
     get_grayscale,
+    gray_region,
     thresholding,
     remove_noise,
     pytesseract,
-    detect_plate_contours
+    detect_plate_contours,
+    detect_plate_quad,
+    rectify_plate,
+    prepare_scaled_plate,
+    enhance_small_plate_image,
+    enhanced_preprocessing,
+    SMALL_PLATE_SCALE,
+    SOURCE_MAX_BYTES,
+    UPSCALE_MEMORY_BUDGET
 )
-
-def correct_ocr_errors(text):
-    """Corrige errores comunes de OCR en placas bolivianas"""
-    if not text:
-        return text
-    
-    # Correcciones específicas de OCR
-    corrections = {
-        'I': '1',  # I confundida con 1
-        'O': '0',  # O confundida con 0  
-        'S': '5',  # S confundida con 5 (en posición de número)
-        'G': '6',  # G confundida con 6 (en posición de número)
-        'B': '8',  # B confundida con 8 (en posición de número)
-        'Z': '2',  # Z confundida con 2 (en posición de número)
-    }
-    
-    result = text.upper()
-    
-    # Aplicar correcciones solo en las primeras 4 posiciones (números)
-    if len(result) >= 4:
-        # Corregir caracteres en posiciones de números (0-3)
-        number_part = result[:4]
-        letter_part = result[4:]
-        
-        corrected_numbers = ""
-        for char in number_part:
-            corrected_numbers += corrections.get(char, char)
-        
-        # Para las letras (posiciones 4-6), hacer correcciones inversas
-        corrected_letters = ""
-        for char in letter_part:
-            # Corregir números que deberían ser letras
-            if char == '0':
-                corrected_letters += 'O'
-            elif char == '1':
-                corrected_letters += 'I'
-            elif char == '5':
-                corrected_letters += 'S'
-            elif char == '6':
-                corrected_letters += 'G'
-            elif char == '8':
-                corrected_letters += 'B'
-            elif char == '2':
-                corrected_letters += 'Z'
-            else:
-                corrected_letters += char
-        
-        result = corrected_numbers + corrected_letters
-    
-    return result
+from lib.plate_decoder import correct_ocr_errors
+from lib import metrics
+from lib.load_shedding import LoadShedder
+from lib.image_loader import iter_image_files, load_image, load_plate_crop
+from lib.watch_folder import CheckpointManifest, watch_for_changes
+from lib.result_sink import ResultWriter, RunSummary
+from lib.detection_store import DetectionStore
+from lib.registry import PlateRegistry
+from lib.zone_ocr import split_zone_ocr
+from lib.ocr_choices import read_plate_choices
+from lib.shared_frames import frame_view, ring_for_frame
+from lib.pipeline import Pipeline, Stage, StageError
+from lib.scheduler import DEFAULT_MAX_AGE, CameraScheduler, run_workers
+from lib import exec_config
+from lib.presence import PRESENCE_THRESHOLD, has_plate
+from lib.quality import QUALITY_ROUTES, quality_gate, record_quality
+from lib.localization import locate_character_row, locate_plate
+from bolivia_quick import quick_ocr_scan
 
 def normalize_bolivian_plate(plate_text):
     """Normaliza placa boliviana al formato estricto 1234 ABC"""
@@ -102,136 +84,379 @@ def get_last_digit(plate_text):
     
     return None
 
-def advanced_ocr_scan(image):
-    """Escaneo OCR avanzado específicamente para placas bolivianas"""
+# Modos de advanced_ocr_scan: barrido completo, zonas dígitos/letras por separado
+# o una sola pasada decodificando las alternativas por carácter de Tesseract
+OCR_MODES = ('sweep', 'split', 'choices')
+
+# Configuración única para la placa enderezada a tamaño fijo (una sola línea de texto)
+RECTIFIED_CONFIG = '--psm 7 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+def read_rectified_plate(rectified):
+    """OCR de la placa enderezada con una sola configuración. Retorna '1234ABC' o None"""
+    processed = remove_noise(thresholding(rectified))
+    raw_text = pytesseract.image_to_string(processed, config=RECTIFIED_CONFIG)
+    for line in raw_text.split('\n'):
+        if any(word in line.upper() for word in ['BOLIVIA', 'ESTADO', 'PLURINACIONAL', 'DEPARTAMENTO']):
+            continue
+        corrected_line = correct_ocr_errors(re.sub(r'[^A-Z0-9]', '', line.upper()))
+        if re.match(r'^\d{4}[A-Z]{3}$', corrected_line):
+            return corrected_line
+    return None
+
+def _record_ocr_calls(stats, calls):
+    metrics.observe('scan_ocr_calls', calls)
+    if stats is not None:
+        stats['ocr_calls'] = calls
+
+def _record_scan(stats, calls, peak_bytes):
+    _record_ocr_calls(stats, calls)
+    metrics.observe('scan_peak_bytes', peak_bytes)
+    if stats is not None:
+        stats['peak_bytes'] = peak_bytes
+
+# Búferes del tamaño del resultado que cada paso tiene vivos a la vez, incluido el
+# resultado (calibrados con tracemalloc). Las etiquetas int32 de connectedComponents
+# ocupan 4: por eso pesan la estimación de caracteres y la de inclinación
+REDUCE_BUFFERS = 4        # gray_region reduciendo: el recorte en color reducido y su gris
+THRESHOLD_BUFFERS = 2     # umbral + mediana
+SCALED_BUFFERS = 8        # prepare_scaled_plate: las etiquetas int32 de estimate_char_size
+SMALL_PLATE_BUFFERS = 3   # enhance_small_plate_image
+DESKEW_BUFFERS = 5        # enhanced_preprocessing
+QUAD_SEARCH_BUFFERS = 4   # detect_plate_quad, sobre el frame reducido a SOURCE_MAX_BYTES
+
+class ScanMemory:
+    """Pico estimado de la memoria de imagen de un escaneo.
+
+    `held` suma los búferes que el escaneo retiene hasta terminar (recortes y
+    variantes); mientras corre, cada paso agrega sus intermedios.
+    """
+    
+    def __init__(self):
+        self.held = 0
+        self.peak = 0
+    
+    def transient(self, nbytes):
+        """Intermedios de un paso que se liberan al terminar"""
+        self.peak = max(self.peak, self.held + nbytes)
+    
+    def step(self, result, buffers=1):
+        """Cuenta un paso con `buffers` búferes del tamaño de su resultado y retiene el resultado"""
+        self.transient(result.nbytes * buffers)
+        self.held += result.nbytes
+        return result
+    
+    def gray(self, result, scale):
+        """Cuenta un recorte de gray_region reducido por `scale`"""
+        return self.step(result, REDUCE_BUFFERS if scale < 1.0 else 1)
+
+# Valor por defecto de `quad`: localizar la placa dentro del escaneo
+LOCATE_PLATE = object()
+
+def advanced_ocr_scan(image, stats=None, max_bytes=UPSCALE_MEMORY_BUDGET, mode='sweep', camera=None,
+                      quad=LOCATE_PLATE, localizer='glyphs', region=LOCATE_PLATE):
+    """Escaneo OCR avanzado específicamente para placas bolivianas.
+
+    La región de la placa (o la imagen completa) se amplía una sola vez con el
+    factor estimado a partir de la altura de los caracteres, sin superar
+    max_bytes. Todas las variantes parten del recorte de la placa o, si no se
+    localizó, del frame completo reducido, ambos limitados a SOURCE_MAX_BYTES: la
+    memoria no crece con el tamaño del frame. Si se pasa un diccionario `stats`,
+    se llena (en todos los caminos de salida) con 'peak_bytes': pico estimado de
+    la memoria de imagen del escaneo (ver ScanMemory) y 'ocr_calls': cantidad de
+    llamadas a Tesseract.
+    Si se encuentra la franja azul de la placa, primero se lee sólo la fila de
+    caracteres con una configuración. Si la placa se localiza como un cuadrilátero, primero se endereza a
+    RECTIFIED_PLATE_SIZE y se lee con una sola configuración; las variantes
+    ampliada y ecualizada quedan sólo para cuando esa lectura falla.
+    `camera` identifica una cámara fija para reutilizar su ángulo de inclinación.
+    `quad` permite pasar las esquinas de la placa ya localizadas (o None si no
+    se encontró) para no repetir la detección. Si no hay cuadrilátero, la región
+    se busca con `localizer` (un nombre de lib.localization.LOCALIZERS, o None
+    para no buscarla): por defecto los grupos de caracteres, que no necesitan
+    que la placa tenga borde. `region` permite pasar la región que ya encontró
+    `localizer` (o None si no la encontró) para no volver a buscarla.
+    Con mode='split' se intenta primero leer la placa localizada por zonas
+    (4 dígitos + 3 letras) y con mode='choices' una sola lectura de la placa
+    ampliada decodificada con la gramática; sólo si fallan se hace el barrido
+    completo.
+    """
     #print("  🔍 Escaneo avanzado para Bolivia...")
     
     best_result = None
     best_score = 0
+    ocr_calls = 0
+    memory = ScanMemory()
     
-    # Estrategias optimizadas para placas bolivianas
-    strategies = []
-    
-    # 1. Original procesado
-    gray = get_grayscale(image)
-    processed = remove_noise(thresholding(gray))
-    strategies.append(("original", processed))
-    
-    # 2. Imagen ampliada x2.5 para mayor claridad en números
     try:
-        enlarged = cv2.resize(image, None, fx=2.5, fy=2.5, interpolation=cv2.INTER_CUBIC)
-        enlarged_gray = get_grayscale(enlarged)
-        enlarged_processed = remove_noise(thresholding(enlarged_gray))
-        strategies.append(("enlarged", enlarged_processed))
-    except:
-        pass
-    
-    # 3. Región de placa detectada automáticamente
+        # Fila de caracteres anclada en la franja azul: una lectura que nunca ve la leyenda BOLIVIA
+        try:
+            row_region = locate_character_row(image)
+            if row_region:
+                ocr_calls += 1
+                row = memory.gray(*gray_region(image, row_region))
+                memory.transient(row.nbytes * THRESHOLD_BUFFERS)
+                band_result = read_rectified_plate(row)
+                if band_result:
+                    metrics.increment('scan.band_hit')
+                    return band_result
+        except Exception:
+            pass
+        
+        # Región de placa detectada automáticamente (con margen generoso)
+        crop_box = None
+        plate_region = None
+        try:
+            if quad is LOCATE_PLATE:
+                quad = detect_plate_quad(image)
+                memory.transient(QUAD_SEARCH_BUFFERS * min(image.shape[0] * image.shape[1], SOURCE_MAX_BYTES))
+            plate_region = cv2.boundingRect(quad) if quad is not None else None
+            if plate_region is None and localizer:
+                if region is LOCATE_PLATE:
+                    region = locate_plate(image, localizer)
+                plate_region = region
+                if plate_region:
+                    metrics.increment(f'scan.{localizer}_region')
+            if quad is not None:
+                # Placa enderezada a tamaño fijo: no necesita ampliación ni reintentos
+                ocr_calls += 1
+                try:
+                    x, y, _, _ = plate_region
+                    plate, scale = gray_region(image, plate_region)
+                    memory.gray(plate, scale)
+                    rectified = memory.step(rectify_plate(plate, (quad - (x, y)) * scale))
+                    memory.transient(rectified.nbytes * THRESHOLD_BUFFERS)
+                    rectified_result = read_rectified_plate(rectified)
+                except Exception:
+                    rectified_result = None
+                if rectified_result:
+                    metrics.increment('scan.rectified_hit')
+                    return rectified_result
+            
+            if plate_region:
+                x, y, w, h = plate_region
+                margin = 20  # Margen más generoso
+                x_m = max(0, x - margin)
+                y_m = max(0, y - margin)
+                w_m = min(image.shape[1] - x_m, w + 2*margin)
+                h_m = min(image.shape[0] - y_m, h + 2*margin)
+                
+                if w_m > 50 and h_m > 20:
+                    crop_box = (x_m, y_m, w_m, h_m)
+                
+                if mode == 'split':
+                    # Sólo las llamadas hechas: la división puede fallar o cortar tras los dígitos
+                    split_stats = {}
+                    try:
+                        split_result = split_zone_ocr(image, plate_region, split_stats)
+                    finally:
+                        ocr_calls += split_stats.get('ocr_calls', 0)
+                    if split_result:
+                        metrics.increment('scan.split_hit')
+                        return split_result
+                    metrics.increment('scan.split_fallback')
+        except:
+            pass
+        
+        # Las variantes parten del recorte de la placa; sin placa, del frame completo reducido.
+        # Ambos se limitan a SOURCE_MAX_BYTES, así la memoria no crece con el frame
+        source, scale = gray_region(image, crop_box)
+        skew_region = None
+        if crop_box is None and plate_region:
+            skew_region = tuple(int(value * scale) for value in plate_region)
+        memory.gray(source, scale)
+        
+        # Estrategias optimizadas para placas bolivianas
+        strategies = []
+        
+        # 1. Original procesado
+        processed = remove_noise(thresholding(source))
+        strategies.append(("original", memory.step(processed, THRESHOLD_BUFFERS)))
+        
+        # 2. Región ampliada una sola vez al tamaño óptimo de carácter
+        try:
+            scaled_processed, factor = prepare_scaled_plate(source, None, max_bytes)
+            buffers = SMALL_PLATE_BUFFERS if factor >= SMALL_PLATE_SCALE else SCALED_BUFFERS
+            strategies.append(("scaled", memory.step(scaled_processed, buffers)))
+        except Exception:
+            pass
+        
+        # Una sola pasada sobre la variante ampliada, con las alternativas de cada carácter
+        if mode == 'choices':
+            try:
+                ocr_calls += 1
+                choices_result = read_plate_choices(strategies[-1][1])
+                if choices_result:
+                    metrics.increment('scan.choices_hit')
+                    return choices_result
+            except Exception:
+                pass
+            metrics.increment('scan.choices_fallback')
+        
+        # 3. Procesamiento con ecualización de histograma
+        try:
+            enhanced = enhanced_preprocessing(source, skew_region, camera)
+            strategies.append(("enhanced", memory.step(enhanced, DESKEW_BUFFERS)))
+        except Exception:
+            pass
+        
+        #print(f"  📊 Probando {len(strategies)} estrategias...")
+        
+        # Configuraciones OCR específicas para números y letras
+        configs = [
+            # Configuración optimizada para 4 números + 3 letras
+            '--psm 8 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ',
+            '--psm 7 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ',
+            '--psm 6 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ',
+            '--psm 13 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+        ]
+        
+        candidates = []
+        
+        for strategy_name, img_variant in strategies:
+            for config in configs:
+                try:
+                    ocr_calls += 1
+                    raw_text = pytesseract.image_to_string(img_variant, config=config).strip()
+                
+                    if not raw_text or len(raw_text) < 3:
+                        continue
+                
+                    # Procesar líneas
+                    lines = [line.strip() for line in raw_text.split('\n') if line.strip()]
+                
+                    for line in lines:
+                        # Filtrar texto no-placa
+                        if any(word in line.upper() for word in ['BOLIVIA', 'ESTADO', 'PLURINACIONAL', 'DEPARTAMENTO']):
+                            continue
+                    
+                        # Limpiar y aplicar correcciones
+                        clean_line = re.sub(r'[^A-Z0-9]', '', line.upper())
+                        corrected_line = correct_ocr_errors(clean_line)
+                    
+                        # Verificar longitud y formato boliviano
+                        if len(corrected_line) == 7:
+                            if re.match(r'^\d{4}[A-Z]{3}$', corrected_line):
+                            
+                                # Scoring para placas bolivianas
+                                score = 50  # Base alta para formato perfecto
+                            
+                                # Bonificaciones por estrategia
+                                if strategy_name == "scaled":
+                                    score += 10
+                                elif strategy_name == "enhanced":
+                                    score += 5
+                            
+                                # Bonificación si no requirió muchas correcciones
+                                if clean_line == corrected_line:
+                                    score += 15  # Sin correcciones necesarias
+                            
+                                candidates.append((corrected_line, score, strategy_name, line))
+                            
+                                if score > best_score:
+                                    best_score = score
+                                    best_result = corrected_line
+                                
+                except Exception as e:
+                    continue
+        
+        #print(f"  📋 {len(candidates)} candidatos encontrados")
+        if best_result:
+            #print(f"  🏆 Mejor: {best_result} (score: {best_score})")
+            # Mostrar correcciones aplicadas si las hubo
+            for candidate, score, strategy, original in candidates:
+                if candidate == best_result and candidate != original.replace(' ', '').replace('-', '').upper():
+                    print(f"  🔧 Corregido de: {original} → {best_result}")
+                    break
+        
+        return best_result
+    finally:
+        _record_scan(stats, ocr_calls, memory.peak)
+
+def single_config_scan(image):
+    """Escaneo mínimo: una sola variante de imagen y la mejor configuración OCR"""
+    variant = image
     try:
         plate_region = detect_plate_contours(image)
         if plate_region:
             x, y, w, h = plate_region
-            margin = 20  # Margen más generoso
+            margin = 20
             x_m = max(0, x - margin)
             y_m = max(0, y - margin)
-            w_m = min(image.shape[1] - x_m, w + 2*margin)
-            h_m = min(image.shape[0] - y_m, h + 2*margin)
-            
-            if w_m > 50 and h_m > 20:
-                cropped = image[y_m:y_m+h_m, x_m:x_m+w_m]
-                cropped_gray = get_grayscale(cropped)
-                cropped_processed = remove_noise(thresholding(cropped_gray))
-                strategies.append(("region", cropped_processed))
+            variant = image[y_m:y + h + margin, x_m:x + w + margin]
     except:
         pass
     
-    # 4. Procesamiento con ecualización de histograma
+    processed = remove_noise(thresholding(get_grayscale(variant)))
+    config = '--psm 7 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+    
     try:
-        from lib.filters import enhanced_preprocessing
-        enhanced = enhanced_preprocessing(gray)
-        strategies.append(("enhanced", enhanced))
-    except:
-        pass
+        raw_text = pytesseract.image_to_string(processed, config=config).strip()
+    except Exception:
+        return None
     
-    #print(f"  📊 Probando {len(strategies)} estrategias...")
+    for line in raw_text.split('\n'):
+        if any(word in line.upper() for word in ['BOLIVIA', 'ESTADO', 'PLURINACIONAL', 'DEPARTAMENTO']):
+            continue
+        corrected_line = correct_ocr_errors(re.sub(r'[^A-Z0-9]', '', line.upper()))
+        if re.match(r'^\d{4}[A-Z]{3}$', corrected_line):
+            return corrected_line
     
-    # Configuraciones OCR específicas para números y letras
+    return None
+
+def small_plate_scan(image, region=None, stats=None):
+    """Camino de realce para placas pequeñas o borrosas (el tratamiento de test_placa8_enhanced.py):
+    una sola variante de la región (x, y, w, h) con enhance_small_plate_image y las cuatro
+    configuraciones de página
+    """
+    enhanced = enhance_small_plate_image(image, region)
     configs = [
-        # Configuración optimizada para 4 números + 3 letras
         '--psm 8 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ',
         '--psm 7 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ',
         '--psm 6 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ',
         '--psm 13 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
     ]
     
-    candidates = []
-    
-    for strategy_name, img_variant in strategies:
-        for config in configs:
-            try:
-                raw_text = pytesseract.image_to_string(img_variant, config=config).strip()
-                
-                if not raw_text or len(raw_text) < 3:
-                    continue
-                
-                # Procesar líneas
-                lines = [line.strip() for line in raw_text.split('\n') if line.strip()]
-                
-                for line in lines:
-                    # Filtrar texto no-placa
-                    if any(word in line.upper() for word in ['BOLIVIA', 'ESTADO', 'PLURINACIONAL', 'DEPARTAMENTO']):
-                        continue
-                    
-                    # Limpiar y aplicar correcciones
-                    clean_line = re.sub(r'[^A-Z0-9]', '', line.upper())
-                    corrected_line = correct_ocr_errors(clean_line)
-                    
-                    # Verificar longitud y formato boliviano
-                    if len(corrected_line) == 7:
-                        if re.match(r'^\d{4}[A-Z]{3}$', corrected_line):
-                            
-                            # Scoring para placas bolivianas
-                            score = 50  # Base alta para formato perfecto
-                            
-                            # Bonificaciones por estrategia
-                            if strategy_name == "region":
-                                score += 10
-                            elif strategy_name == "enlarged":
-                                score += 8
-                            elif strategy_name == "enhanced":
-                                score += 5
-                            
-                            # Bonificación si no requirió muchas correcciones
-                            if clean_line == corrected_line:
-                                score += 15  # Sin correcciones necesarias
-                            
-                            candidates.append((corrected_line, score, strategy_name, line))
-                            
-                            if score > best_score:
-                                best_score = score
-                                best_result = corrected_line
-                                
-            except Exception as e:
+    ocr_calls = 0
+    votes = {}
+    for config in configs:
+        try:
+            ocr_calls += 1
+            raw_text = pytesseract.image_to_string(enhanced, config=config).strip()
+        except Exception:
+            continue
+        for line in raw_text.split('\n'):
+            if any(word in line.upper() for word in ['BOLIVIA', 'ESTADO', 'PLURINACIONAL', 'DEPARTAMENTO']):
                 continue
+            corrected_line = correct_ocr_errors(re.sub(r'[^A-Z0-9]', '', line.upper()))
+            if re.match(r'^\d{4}[A-Z]{3}$', corrected_line):
+                votes[corrected_line] = votes.get(corrected_line, 0) + 1
     
-    #print(f"  📋 {len(candidates)} candidatos encontrados")
-    if best_result:
-        #print(f"  🏆 Mejor: {best_result} (score: {best_score})")
-        # Mostrar correcciones aplicadas si las hubo
-        for candidate, score, strategy, original in candidates:
-            if candidate == best_result and candidate != original.replace(' ', '').replace('-', '').upper():
-                print(f"  🔧 Corregido de: {original} → {best_result}")
-                break
-    
-    return best_result
+    _record_ocr_calls(stats, ocr_calls)
+    # La lectura en la que coinciden más configuraciones
+    return max(votes, key=votes.get) if votes else None
+
+# Hilos por etapa del pipeline (--pipeline); reglas y guardado siempre usan uno
+DEFAULT_STAGE_WORKERS = {
+    'decode': 2,
+    'localize': 1,
+    'ocr': exec_config.available_cpus(),
+}
+
+# Función de escaneo para cada perfil del LoadShedder
+SCAN_PROFILES = {
+    'advanced': advanced_ocr_scan,
+    'quick': quick_ocr_scan,
+    'single': single_config_scan,
+}
 
-def is_restricted_day(plate_text):
-    """Verifica restricción por día para placa boliviana"""
+def is_restricted_day(plate_text, current_time=None):
+    """Verifica restricción por día para placa boliviana (por defecto, la de hoy)"""
     last_digit = get_last_digit(plate_text)
     if last_digit is None:
         return False, "No se pudo determinar el último dígito"
     
-    current_time = datetime.datetime.now()
+    if current_time is None:
+        current_time = datetime.datetime.now()
     weekday = current_time.weekday()  # 0=Lunes
     
     # Sábados y domingos sin restricción
@@ -254,9 +479,9 @@ def is_restricted_day(plate_text):
     else:
         return False, f"Permitido circular los {day_names[weekday]}s"
 
-def is_restricted_time():
-    """Verifica restricción por horario según reglamento oficial de La Paz"""
-    current_time = datetime.datetime.now().time()
+def is_restricted_time(current_time=None):
+    """Verifica restricción por horario según reglamento oficial de La Paz (por defecto, ahora)"""
+    current_time = (current_time or datetime.datetime.now()).time()
     
     # Horario oficial: 07:00 - 20:00 (todo el día)
     restriction_start = datetime.time(7, 0)   # 7:00 AM
@@ -267,8 +492,8 @@ def is_restricted_time():
     else:
         return False, "Fuera de horario de restricción (20:01-06:59)"
 
-def main():
-    """Sistema optimizado para placas bolivianas únicamente"""
+def print_banner():
+    """Muestra las reglas de restricción vigentes"""
     print("🇧🇴 SISTEMA DE RESTRICCIÓN VEHICULAR - LA PAZ, BOLIVIA")
     print("="*70)
     print("📋 RESTRICCIONES POR TERMINACIÓN DE PLACA:")
@@ -281,89 +506,669 @@ def main():
     print()
     print("🕐 HORARIO DE RESTRICCIÓN: 07:00 - 20:00")
     print("="*70)
+
+def scan_image(image, profile, ocr_mode='sweep', camera=None, quad=LOCATE_PLATE, region=LOCATE_PLATE):
+    """Detecta la placa con el perfil indicado (ocr_mode, camera, quad y region aplican al perfil avanzado)"""
+    if profile == 'advanced':
+        return advanced_ocr_scan(image, mode=ocr_mode, camera=camera, quad=quad, region=region)
+    return SCAN_PROFILES[profile](image)
+
+def scan_routed(image, profile, ocr_mode='sweep', camera=None, quad=LOCATE_PLATE, quality=None):
+    """Pasa la placa por el filtro de calidad y la escanea por el camino elegido:
+    'fast' el escaneo del perfil, 'enhance' el realce de placas pequeñas y borrosas (y el
+    escaneo del perfil si no lee nada), 'reject' ninguno.
+    La calidad se mide sobre la fila de caracteres localizada; con carga alta (perfiles
+    degradados) no se localiza y sólo se evalúa la imagen completa.
+    `quality` recibe los puntajes y el camino; el llamador los cuenta con record_quality.
+    """
+    if quality is None:
+        quality = {}
+    # La misma región que buscaría advanced_ocr_scan: se le pasa para no localizar dos veces
+    region = locate_plate(image, 'glyphs') if profile == 'advanced' else None
+    scores = quality_gate(image, region)
+    quality.clear()
+    quality.update(scores)
+    
+    if scores['route'] == 'reject':
+        return None
+    if scores['route'] == 'enhance' and region is not None:
+        detected_plate = small_plate_scan(image, region)
+        if detected_plate:
+            return detected_plate
+        metrics.increment('quality.enhance_fallback')
+    return scan_image(image, profile, ocr_mode, camera, quad, region)
+
+def scan_frame(image, img_path, crop_region, profile, ocr_mode='sweep', camera=None, quad=LOCATE_PLATE,
+               presence_threshold=PRESENCE_THRESHOLD, quality=None):
+    """Detecta la placa en la imagen cargada; si era un recorte sin placa legible, reintenta con la imagen completa.
+    Los frames que el pre-filtro de presencia descarta no pasan por OCR, y el resto se escanea
+    según su calidad (ver scan_routed; `quality` recibe los puntajes).
+    """
+    if quality is None:
+        quality = {}
+    detected_plate = None
+    if has_plate(image, presence_threshold):
+        detected_plate = scan_routed(image, profile, ocr_mode, camera, quad, quality)
+    if not detected_plate and crop_region is not None:
+        full_image = load_image(img_path)
+        if has_plate(full_image, presence_threshold):
+            detected_plate = scan_routed(full_image, profile, ocr_mode, camera, quality=quality)
+    # Un solo camino contado por frame: el de la última imagen evaluada
+    if quality:
+        record_quality(quality)
+    return detected_plate
+
+def init_scan_worker(config=None):
+    """Inicializa un proceso trabajador: aplica la configuración de hilos y descarta las
+    métricas heredadas del proceso principal (el anillo se adjunta con el primer frame)
+    """
+    metrics.take_metrics()
+    if config is not None:
+        exec_config.apply(config)
+
+def scan_worker(frame, img_path, crop_region, profile, ocr_mode='sweep', camera=None,
+                presence_threshold=PRESENCE_THRESHOLD):
+    """Cuerpo del proceso trabajador: escanea el frame (en memoria compartida o enviado por pickle).
+    Retorna (placa detectada o None, segundos, puntajes de calidad, métricas del frame);
+    las métricas se registran en este proceso y el principal las suma con metrics.merge_metrics().
+    """
+    start = time.perf_counter()
+    quality = {}
+    detected_plate = scan_frame(frame_view(frame), img_path, crop_region, profile, ocr_mode, camera,
+                                presence_threshold=presence_threshold, quality=quality)
+    return detected_plate, time.perf_counter() - start, quality, metrics.take_metrics()
+
+def capture_time(img_path):
+    """Fecha de captura de la imagen: su mtime, o la hora actual si el archivo ya no está"""
+    try:
+        return datetime.datetime.fromtimestamp(os.stat(img_path).st_mtime)
+    except OSError:
+        return datetime.datetime.now()
+
+def build_result(img_path, detected_plate, profile, registry=None, quality=None, captured_at=None):
+    """Normaliza la placa detectada, verifica restricciones y arma el diccionario de resultado.
+    Si se pasa un PlateRegistry, completa la autorización y los datos del propietario, y si se
+    pasan los puntajes de calidad (scan_frame) se guardan en el resultado.
+    La detección se fecha (y las restricciones se evalúan) en `captured_at`, la captura del
+    frame; por defecto, el mtime del archivo, no la hora en que terminó el OCR.
+    Retorna None si no se obtuvo una placa válida.
+    """
+    if not detected_plate:
+        if quality and quality.get('route') == 'reject':
+            print(f"  ❌ Calidad insuficiente para OCR (nitidez {quality['sharpness']:.0f}, "
+                  f"contraste {quality['contrast']:.0f}, brillo {quality['exposure']:.0f}, "
+                  f"alto {quality['plate_height'] or '?'} px)\n")
+        else:
+            print(f"  ❌ No se detectó placa boliviana\n")
+        return None
     
-    images_dir = Path("../images")
-    image_files = []
+    # Normalizar
+    normalized = normalize_bolivian_plate(detected_plate)
     
-    for ext in ['.jpg', '.jpeg', '.png', '.JPG', '.JPEG', '.PNG']:
-        image_files.extend(images_dir.glob(f"*{ext}"))
+    if not normalized:
+        print(f"  ❌ Formato no válido para Bolivia: {detected_plate}\n")
+        return None
     
-    # Eliminar duplicados por nombre base
-    unique_files = {}
-    for img_path in image_files:
-        base_name = img_path.stem.lower()
-        if base_name not in unique_files:
-            unique_files[base_name] = img_path
+    print(f"  🎯 Detectada: {detected_plate}")
+    print(f"  ✅ Normalizada: {normalized}")
     
-    image_files = sorted(unique_files.values(), key=lambda x: x.name.lower())
+    # Verificar restricciones
+    detected_at = captured_at or capture_time(img_path)
+    day_restricted, day_msg = is_restricted_day(detected_plate, detected_at)
+    time_restricted, time_msg = is_restricted_time(detected_at)
     
-    print(f"🔍 Procesando {len(image_files)} placas bolivianas...\n")
+    if day_restricted and time_restricted:
+        status = "🚫 RESTRINGIDO"
+    elif day_restricted:
+        status = "⚠️ RESTRINGIDO (fuera de horario)"
+    else:
+        status = "✅ PERMITIDO"
     
-    results = []
+    result = {
+        'file': img_path.name,
+        'detected': detected_plate,
+        'normalized': normalized,
+        'status': status,
+        'profile': profile,
+        'detected_at': detected_at.isoformat(timespec='seconds'),
+        'time_restricted': time_restricted
+    }
+    if quality:
+        result['quality'] = quality
+    
+    print(f"  📋 Estado: {status}")
+    print(f"  📅 Día: {day_msg}")
+    print(f"  🕐 Horario: {time_msg}")
+    
+    if registry:
+        registry.annotate(result, detected_at.date())
+        owner_info = result['owner_info']
+        owner_text = f" - {owner_info['owner']} ({owner_info['vehicle_type']})" if owner_info else ""
+        print(f"  🪪 Registro: {result['authorization']}{owner_text}")
+        if result.get('registry_plate'):
+            print(f"  🔎 Coincidencia aproximada: {result['registry_plate']} (distancia {result['match_distance']:.2f})")
+        elif result.get('registry_candidate'):
+            print(f"  🔎 Placa registrada parecida (no autorizada): {result['registry_candidate']} "
+                  f"(distancia {result['match_distance']:.2f})")
+    
+    print()
+    return result
+
+def process_image(img_path, shedder, registry=None, ocr_mode='sweep', camera=None,
+                  presence_threshold=PRESENCE_THRESHOLD, backlog=0):
+    """Procesa una imagen: carga, detección, normalización y verificación de restricciones.
+    `backlog` son las imágenes que esperan detrás de ésta (la cola que ve el LoadShedder).
+    Si se pasa un PlateRegistry, completa la autorización y los datos del propietario.
+    Retorna el diccionario de resultado o None si no se obtuvo una placa válida.
+    """
+    print(f"📷 {img_path.name}")
     
-    for img_path in image_files:
+    try:
+        # Cargar imagen (sólo el recorte de la placa en imágenes grandes)
+        image, crop_region = load_plate_crop(img_path)
+        if image is None:
+            print(f"  ❌ No se pudo cargar la imagen\n")
+            return None
+        
+        # Detectar placa con el perfil que permite la carga actual
+        profile = shedder.profile
+        start = time.perf_counter()
+        quality = {}
+        detected_plate = scan_frame(image, img_path, crop_region, profile, ocr_mode, camera,
+                                    presence_threshold=presence_threshold, quality=quality)
+        new_profile = shedder.update(backlog, time.perf_counter() - start)
+        if new_profile != profile:
+            print(f"  ⚖️ Perfil de escaneo: {profile} → {new_profile}")
+        
+        return build_result(img_path, detected_plate, profile, registry, quality)
+        
+    except Exception as e:
+        print(f"  ❌ Error: {e}\n")
+        return None
+
+def process_parallel(img_paths, workers, shedder, registry=None, ocr_mode='sweep', camera=None, config=None,
+                     presence_threshold=PRESENCE_THRESHOLD):
+    """Procesa las imágenes con `workers` procesos de OCR (con los hilos de `config`, un ExecConfig).
+
+    Este proceso decodifica cada imagen una sola vez en un anillo de memoria
+    compartida y los trabajadores reciben sólo la referencia a la ranura. El
+    anillo se dimensiona con el primer frame y el espacio libre en /dev/shm. Los
+    resultados se entregan en el orden de las imágenes: genera (ruta, resultado o None).
+    """
+    max_pending = workers * 2
+    ring = None
+    pending = deque()
+    
+    def finish():
+        img_path, handle, profile, future = pending.popleft()
         print(f"📷 {img_path.name}")
+        if future is None:
+            print(f"  ❌ No se pudo cargar la imagen\n")
+            return img_path, None
+        try:
+            detected_plate, elapsed, quality, frame_metrics = future.result()
+        except Exception as e:
+            print(f"  ❌ Error: {e}\n")
+            return img_path, None
+        finally:
+            if handle is not None:
+                ring.release(handle)
+        metrics.merge_metrics(frame_metrics)
         
+        new_profile = shedder.update(len(pending), elapsed)
+        if new_profile != profile:
+            print(f"  ⚖️ Perfil de escaneo: {profile} → {new_profile}")
         try:
-            # Cargar imagen
-            image = cv2.imread(str(img_path))
-            if image is None:
-                print(f"  ❌ No se pudo cargar la imagen\n")
-                continue
-            
-            # Detectar placa
-            detected_plate = advanced_ocr_scan(image)
-            
-            if not detected_plate:
-                print(f"  ❌ No se detectó placa boliviana\n")
-                continue
-            
-            # Normalizar
-            normalized = normalize_bolivian_plate(detected_plate)
-            
-            if not normalized:
-                print(f"  ❌ Formato no válido para Bolivia: {detected_plate}\n")
-                continue
-            
-            print(f"  🎯 Detectada: {detected_plate}")
-            print(f"  ✅ Normalizada: {normalized}")
-            
-            # Verificar restricciones
-            day_restricted, day_msg = is_restricted_day(detected_plate)
-            time_restricted, time_msg = is_restricted_time()
-            
-            if day_restricted and time_restricted:
-                status = "🚫 RESTRINGIDO"
-            elif day_restricted:
-                status = "⚠️ RESTRINGIDO (fuera de horario)"
-            else:
-                status = "✅ PERMITIDO"
-            
-            print(f"  📋 Estado: {status}")
-            print(f"  📅 Día: {day_msg}")
-            print(f"  🕐 Horario: {time_msg}\n")
-            
-            results.append({
-                'file': img_path.name,
-                'detected': detected_plate,
-                'normalized': normalized,
-                'status': status
-            })
-            
+            return img_path, build_result(img_path, detected_plate, profile, registry, quality)
         except Exception as e:
             print(f"  ❌ Error: {e}\n")
+            return img_path, None
+    
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_scan_worker,
+                                 initargs=(config,)) as executor:
+            for img_path in img_paths:
+                while len(pending) >= max_pending:
+                    yield finish()
+                
+                image, crop_region = load_plate_crop(img_path)
+                if image is None:
+                    pending.append((img_path, None, None, None))
+                    continue
+                
+                if ring is None:
+                    ring = ring_for_frame(image, max_pending) or False
+                # Frames más grandes que una ranura, o sin ranura libre, viajan por pickle
+                if ring and ring.free_slots:
+                    handle = ring.put(image)
+                else:
+                    handle = None
+                    metrics.increment('ipc.frames_pickled')
+                profile = shedder.profile
+                future = executor.submit(scan_worker, handle or image, img_path, crop_region, profile, ocr_mode,
+                                         camera, presence_threshold)
+                pending.append((img_path, handle, profile, future))
+            
+            while pending:
+                yield finish()
+    finally:
+        if ring:
+            ring.close()
+
+def process_pipeline(img_paths, shedder, registry=None, ocr_mode='sweep', camera=None,
+                     writer=None, store=None, stage_workers=None, presence_threshold=PRESENCE_THRESHOLD,
+                     camera_label=None):
+    """Procesa las imágenes en un pipeline por etapas con colas acotadas:
+    lectura → localización → OCR → reglas → guardado.
+    Genera (ruta, resultado o None) a medida que cada imagen sale del pipeline,
+    también las que fallaron en alguna etapa (con None, como process_image).
+    """
+    workers = dict(DEFAULT_STAGE_WORKERS, **(stage_workers or {}))
+    
+    def decode(img_path):
+        image, crop_region = load_plate_crop(img_path)
+        return {'path': img_path, 'image': image, 'crop_region': crop_region, 'quad': None, 'detected': None}
+    
+    def localize(item):
+        # El pre-filtro de presencia corre antes de localizar: los frames vacíos no llegan al OCR
+        if item['image'] is not None and has_plate(item['image'], presence_threshold):
+            item['quad'] = detect_plate_quad(item['image'])
+        else:
+            item['present'] = False
+        return item
+    
+    def ocr(item):
+        if item['image'] is None:
+            return item
+        profile = shedder.profile
+        start = time.perf_counter()
+        item['quality'] = {}
+        if item.get('present', True):
+            item['detected'] = scan_frame(item['image'], item['path'], item['crop_region'], profile,
+                                          ocr_mode, camera, item['quad'], presence_threshold=0,
+                                          quality=item['quality'])
+        item['profile'] = profile
+        item['new_profile'] = shedder.update(pipeline.queue_depths()['ocr'], time.perf_counter() - start)
+        # La imagen ya no se necesita: liberar memoria antes de las etapas siguientes
+        item['image'] = None
+        return item
+    
+    def rules(item):
+        img_path = item['path']
+        print(f"📷 {img_path.name}")
+        if 'profile' not in item:
+            print(f"  ❌ No se pudo cargar la imagen\n")
+            item['result'] = None
+            return item
+        if item['new_profile'] != item['profile']:
+            print(f"  ⚖️ Perfil de escaneo: {item['profile']} → {item['new_profile']}")
+        item['result'] = build_result(img_path, item['detected'], item['profile'], registry, item['quality'])
+        return item
+    
+    def sink(item):
+        if item['result']:
+            save_result(item['result'], writer, store, camera_label or camera or '')
+        return item['path'], item['result']
+    
+    pipeline = Pipeline([
+        Stage('decode', decode, workers['decode']),
+        Stage('localize', localize, workers['localize']),
+        Stage('ocr', ocr, workers['ocr']),
+        # Reglas y guardado con un solo hilo: salida por consola y escritores secuenciales
+        Stage('rules', rules, 1),
+        Stage('sink', sink, 1),
+    ])
+    results = pipeline.run(img_paths)
+    try:
+        for item in results:
+            if isinstance(item, StageError):
+                # decode recibe la ruta; las demás etapas, el diccionario del frame
+                img_path = item.item['path'] if isinstance(item.item, dict) else item.item
+                print(f"📷 {img_path.name}")
+                print(f"  ❌ Error en la etapa {item.stage}: {item.error}\n")
+                item = img_path, None
+            yield item
+    finally:
+        results.close()
+
+def parse_stage_workers(values):
+    """Convierte ['ocr=4', 'decode=2'] en {'ocr': 4, 'decode': 2}"""
+    stage_workers = {}
+    for value in values or []:
+        name, _, count = value.partition('=')
+        if name not in DEFAULT_STAGE_WORKERS or not count.isdigit() or int(count) < 1:
+            raise argparse.ArgumentTypeError(f"Etapa inválida: {value} (etapas: {', '.join(DEFAULT_STAGE_WORKERS)})")
+        stage_workers[name] = int(count)
+    return stage_workers
+
+def save_result(result, writer=None, store=None, camera=''):
+    """Envía un resultado a los destinos configurados (archivo y/o base de datos)"""
+    result['camera'] = camera
+    if writer:
+        writer.write(result)
+    if store:
+        store.add_result(result)
+
+def watch_directory(images_dir, manifest_path, interval=2.0, writer=None, store=None, camera=None, registry=None,
+                    ocr_mode='sweep', presence_threshold=PRESENCE_THRESHOLD, camera_label=None):
+    """Modo vigilancia: procesa sólo imágenes nuevas o modificadas, reanudable tras una caída.
+    `camera` identifica una cámara fija (reutiliza su ángulo de inclinación); `camera_label`
+    es el nombre que se guarda en los resultados (por defecto `camera`).
+    """
+    manifest = CheckpointManifest(manifest_path)
+    shedder = LoadShedder()
+    
+    print(f"👀 Vigilando {images_dir} (cada {interval:g}s, checkpoint: {manifest_path})")
+    print(f"📂 {len(manifest.entries)} imágenes ya procesadas en el checkpoint\n")
+    
+    listing = {}
+    try:
+        for img_path, size, mtime_ns, digest in watch_for_changes(images_dir, manifest, interval, stats=listing):
+            result = process_image(img_path, shedder, registry, ocr_mode, camera, presence_threshold,
+                                   listing['backlog'])
+            if result:
+                save_result(result, writer, store, camera_label or camera or '')
+            manifest.mark_processed(img_path, size, mtime_ns, digest)
+    except KeyboardInterrupt:
+        print("\n🛑 Vigilancia detenida")
+    finally:
+        manifest.close()
+
+def parse_camera_options(values, cast=str):
+    """Convierte ['norte=/ruta', 'sur=/otra'] en {'norte': '/ruta', 'sur': '/otra'} aplicando `cast` al valor"""
+    options = {}
+    for value in values or []:
+        name, _, option = value.partition('=')
+        if not name or not option:
+            raise argparse.ArgumentTypeError(f"Opción de cámara inválida: {value} (formato NOMBRE=VALOR)")
+        try:
+            options[name] = cast(option)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Valor inválido para la cámara {name}: {option}")
+    return options
+
+def watch_cameras(camera_dirs, weights=None, workers=1, interval=2.0, max_age=DEFAULT_MAX_AGE, writer=None,
+                  store=None, registry=None, ocr_mode='sweep', presence_threshold=PRESENCE_THRESHOLD):
+    """Modo vigilancia con varias cámaras: un hilo sondea cada directorio y los trabajadores
+    toman los frames del CameraScheduler, que reparte el OCR según el peso de cada cámara
+    y descarta los frames que esperaron más de `max_age` segundos en cola. Los descartados
+    no se marcan en el checkpoint: se vuelven a encolar en un listado posterior.
+    """
+    scheduler = CameraScheduler(weights, max_age=max_age)
+    shedder = LoadShedder()
+    manifests = {camera: CheckpointManifest(Path(directory) / '.checkpoint.jsonl')
+                 for camera, directory in camera_dirs.items()}
+    output_lock = threading.Lock()
+    in_flight = set()
+    stop = threading.Event()
+    
+    def frame_time(mtime_ns):
+        # Captura del frame: el mtime del listado, sin volver a leer el archivo
+        return datetime.datetime.fromtimestamp(mtime_ns / 1e9)
+    
+    def feed(camera, directory):
+        # Un archivo en cola no se vuelve a encolar aunque el siguiente listado lo vea sin marcar
+        for img_path, size, mtime_ns, digest in watch_for_changes(directory, manifests[camera], interval):
+            if stop.is_set():
+                return
+            key = (camera, str(img_path), mtime_ns)
+            with output_lock:
+                if key in in_flight:
+                    continue
+                in_flight.add(key)
+            # El plazo cuenta desde que entra en la cola: el atraso acumulado (p. ej. al
+            # arrancar con imágenes pendientes) se procesa en vez de descartarse de entrada
+            scheduler.submit(camera, (img_path, size, mtime_ns, digest), captured_at=frame_time(mtime_ns))
+    
+    def finish(camera, item, result=None):
+        img_path, size, mtime_ns, digest = item
+        if result:
+            save_result(result, writer, store, camera)
+        manifests[camera].mark_processed(img_path, size, mtime_ns, digest)
+        in_flight.discard((camera, str(img_path), mtime_ns))
+    
+    def release_dropped():
+        # Sin checkpoint: el archivo sigue pendiente y un listado posterior lo reencola
+        with output_lock:
+            for camera, (img_path, _, mtime_ns, _) in scheduler.take_dropped():
+                print(f"⏭️ [{camera}] {img_path.name}: descartado por antigüedad, se reintentará\n")
+                in_flight.discard((camera, str(img_path), mtime_ns))
+    
+    def handle(camera, item):
+        img_path, _, mtime_ns, _ = item
+        result = None
+        try:
+            image, crop_region = load_plate_crop(img_path)
+            profile = shedder.profile
+            detected_plate = None
+            quality = {}
+            if image is not None:
+                start = time.perf_counter()
+                detected_plate = scan_frame(image, img_path, crop_region, profile, ocr_mode, camera,
+                                            presence_threshold=presence_threshold, quality=quality)
+                shedder.update(sum(scheduler.queue_depths().values()), time.perf_counter() - start)
+            
+            with output_lock:
+                print(f"📷 [{camera}] {img_path.name}")
+                if image is None:
+                    print(f"  ❌ No se pudo cargar la imagen\n")
+                else:
+                    result = build_result(img_path, detected_plate, profile, registry, quality,
+                                          frame_time(mtime_ns))
+            scheduler.report_restricted(camera, bool(result) and 'RESTRINGIDO' in result['status'])
+        finally:
+            # Aunque el escaneo falle, el archivo sale de la cola y queda en el checkpoint
+            with output_lock:
+                finish(camera, item, result)
+            release_dropped()
+    
+    for camera, directory in camera_dirs.items():
+        weight = scheduler.weights.get(camera, scheduler.default_weight)
+        print(f"👀 [{camera}] Vigilando {directory} (peso {weight:g}, "
+              f"{len(manifests[camera].entries)} imágenes ya procesadas)")
+    print(f"⚙️ {workers} trabajadores, descarte tras {max_age:g}s en cola\n")
+    
+    feeders = [threading.Thread(target=feed, args=(camera, directory), name=f'watch-{camera}', daemon=True)
+               for camera, directory in camera_dirs.items()]
+    for feeder in feeders:
+        feeder.start()
+    threads = run_workers(scheduler, handle, workers)
+    
+    try:
+        while True:
+            time.sleep(interval)
+            # Los descartes se liberan aunque ningún trabajador termine un frame
+            release_dropped()
+    except KeyboardInterrupt:
+        print("\n🛑 Vigilancia detenida")
+    finally:
+        stop.set()
+        scheduler.close()
+        for thread in threads:
+            thread.join()
+        for manifest in manifests.values():
+            manifest.close()
+    
+    for camera, stats in scheduler.stats().items():
+        dropped = stats.get('dropped_stale', 0) + stats.get('dropped_overflow', 0)
+        print(f"📷 [{camera}] procesadas: {stats.get('processed', 0)}, descartadas: {dropped}, "
+              f"{stats['throughput'] * 60:.1f} imágenes/min")
+
+def main():
+    """Sistema optimizado para placas bolivianas únicamente"""
+    parser = argparse.ArgumentParser(description="Control de restricción vehicular para placas bolivianas")
+    parser.add_argument('images_dir', nargs='?', default='../images', help="Directorio de imágenes")
+    parser.add_argument('--watch', action='store_true', help="Vigilar el directorio y procesar imágenes nuevas")
+    parser.add_argument('--interval', type=float, default=2.0, help="Segundos entre sondeos en modo vigilancia")
+    parser.add_argument('--manifest', default=None, help="Archivo de checkpoint (por defecto <images_dir>/.checkpoint.jsonl)")
+    parser.add_argument('--output', default=None, help="Guardar resultados en .jsonl o .csv (agregar .gz para comprimir)")
+    parser.add_argument('--db', default=None, help="Registrar detecciones en una base SQLite")
+    parser.add_argument('--registry', default=None, help="Registro de placas autorizadas (.csv o .db)")
+    parser.add_argument('--camera', default=None,
+                        help="Identificador de una cámara fija: reutiliza su ángulo de inclinación entre imágenes "
+                             "(sin él, los resultados se etiquetan con el nombre del directorio)")
+    parser.add_argument('--ocr-mode', choices=OCR_MODES, default='sweep',
+                        help="sweep: barrido de configuraciones; split: zonas de dígitos y letras por separado; "
+                             "choices: una pasada con las alternativas de Tesseract por carácter")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Procesos de OCR en paralelo (los frames se comparten por memoria compartida); "
+                             "por defecto según --exec-mode")
+    parser.add_argument('--exec-mode', choices=exec_config.EXEC_MODES, default='latency',
+                        help="latency: una imagen a la vez con todos los núcleos; throughput: un proceso por "
+                             "núcleo con un hilo cada uno; default: hilos por defecto de Tesseract y OpenCV")
+    parser.add_argument('--pipeline', action='store_true',
+                        help="Pipeline por etapas con colas acotadas (lectura, localización, OCR, reglas, guardado)")
+    parser.add_argument('--stage-workers', nargs='+', metavar='ETAPA=N', default=None,
+                        help="Hilos por etapa del pipeline, p. ej. decode=2 localize=1 ocr=4")
+    parser.add_argument('--presence-threshold', type=float, default=PRESENCE_THRESHOLD,
+                        help="Puntaje mínimo del pre-filtro de presencia de placa para pasar a OCR (0 lo desactiva)")
+    parser.add_argument('--cameras', nargs='+', metavar='CÁMARA=DIR', default=None,
+                        help="Vigilar varias cámaras a la vez, p. ej. norte=/capturas/norte sur=/capturas/sur "
+                             "(--workers fija los hilos de OCR compartidos)")
+    parser.add_argument('--camera-weights', nargs='+', metavar='CÁMARA=PESO', default=None,
+                        help="Peso de cada cámara en el reparto del OCR (por defecto 1)")
+    parser.add_argument('--max-age', type=float, default=DEFAULT_MAX_AGE,
+                        help="Segundos que un frame puede esperar en cola antes de descartarse")
+    args = parser.parse_args()
+    try:
+        stage_workers = parse_stage_workers(args.stage_workers)
+        camera_dirs = parse_camera_options(args.cameras)
+        camera_weights = parse_camera_options(args.camera_weights, float)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+    
+    print_banner()
+    
+    config = exec_config.plan(args.exec_mode)
+    if args.pipeline:
+        config = exec_config.with_workers(config, stage_workers.get('ocr', DEFAULT_STAGE_WORKERS['ocr']))
+    elif args.workers:
+        config = exec_config.with_workers(config, args.workers)
+    exec_config.apply(config)
+    print(f"🧵 {config.cpus} núcleos disponibles, {config.workers} trabajadores de OCR "
+          f"(Tesseract: {config.ocr_threads or 'por defecto'} hilos, OpenCV: {config.cv_threads or 'por defecto'})")
+    
+    images_dir = Path(args.images_dir)
+    # Sólo una cámara fija indicada explícitamente comparte el ángulo de inclinación entre imágenes;
+    # una carpeta de fotos sueltas se endereza imagen por imagen
+    camera = args.camera
+    camera_label = camera if camera is not None else images_dir.resolve().name
+    writer = ResultWriter(args.output) if args.output else None
+    store = DetectionStore(args.db) if args.db else None
+    registry = PlateRegistry(args.registry) if args.registry else None
+    if registry:
+        print(f"🪪 Registro de autorizados: {len(registry)} vehículos")
+    
+    try:
+        if camera_dirs:
+            watch_cameras(camera_dirs, camera_weights, config.workers, args.interval, args.max_age, writer, store,
+                          registry, args.ocr_mode, args.presence_threshold)
+            return
+        
+        if args.watch:
+            manifest_path = Path(args.manifest) if args.manifest else images_dir / '.checkpoint.jsonl'
+            watch_directory(images_dir, manifest_path, args.interval, writer, store, camera, registry, args.ocr_mode,
+                            args.presence_threshold, camera_label)
+            return
+        
+        print("🔍 Procesando placas bolivianas...\n")
+        
+        summary = RunSummary()
+        shedder = LoadShedder()
+        
+        if args.pipeline:
+            # El pipeline guarda los resultados en su última etapa
+            results = process_pipeline(iter_image_files(images_dir), shedder, registry, args.ocr_mode, camera,
+                                       writer, store, stage_workers, args.presence_threshold, camera_label)
+        elif config.workers > 1:
+            results = process_parallel(iter_image_files(images_dir), config.workers, shedder, registry,
+                                       args.ocr_mode, camera, config, args.presence_threshold)
+        else:
+            # Se lee el listado completo (sigue siendo una sola pasada) para conocer la cola:
+            # las imágenes que faltan son el atraso que ve el LoadShedder
+            img_paths = list(iter_image_files(images_dir))
+            results = ((img_path, process_image(img_path, shedder, registry, args.ocr_mode, camera,
+                                                args.presence_threshold, len(img_paths) - index - 1))
+                       for index, img_path in enumerate(img_paths))
+        
+        for img_path, result in results:
+            summary.count_image()
+            if result:
+                summary.add(result)
+                if not args.pipeline:
+                    save_result(result, writer, store, camera_label)
+    finally:
+        if writer:
+            writer.close()
+        if store:
+            store.close()
     
     # Resumen final
-    if results:
+    if summary.detected:
         print("🎯 RESUMEN FINAL - PLACAS BOLIVIANAS")
         print("="*70)
-        for r in results:
-            print(f"📋 {r['file']}: {r['normalized']} → {r['status']}")
+        for status, count in summary.status_counts.items():
+            print(f"📋 {status}: {count}")
         
-        print(f"\n📊 Placas bolivianas procesadas: {len(results)}/{len(image_files)}")
-        print(f"📈 Tasa de éxito: {len(results)*100/len(image_files):.1f}%")
+        print(f"\n📊 Placas bolivianas procesadas: {summary.detected}/{summary.total}")
+        print(f"📈 Tasa de éxito: {summary.success_rate:.1f}%")
+        if writer:
+            print(f"💾 Resultados guardados en: {args.output}")
     else:
         print("❌ No se detectaron placas bolivianas válidas")
+    
+    scan_metrics = metrics.get_metrics()
+    degradations = scan_metrics['counters'].get('events.load_shed', 0)
+    if degradations:
+        print(f"⚖️ Degradaciones por carga: {degradations}")
+    
+    rejected = scan_metrics['counters'].get('presence.rejected', 0)
+    if rejected:
+        accepted = scan_metrics['counters'].get('presence.accepted', 0)
+        print(f"🚫 Frames descartados sin OCR por el pre-filtro: {rejected}/{rejected + accepted}")
+    
+    routes = {route: scan_metrics['counters'].get(f'quality.{route}', 0) for route in QUALITY_ROUTES}
+    if any(routes.values()):
+        print(f"🔬 Calidad: {routes['fast']} rápidas, {routes['enhance']} con realce, {routes['reject']} descartadas")
+    
+    rectified_hits = scan_metrics['counters'].get('scan.rectified_hit', 0)
+    if rectified_hits:
+        print(f"📐 Placas leídas tras enderezarlas: {rectified_hits}")
+    
+    band_hits = scan_metrics['counters'].get('scan.band_hit', 0)
+    if band_hits:
+        print(f"🟦 Placas leídas en la fila anclada a la franja azul: {band_hits}")
+    
+    split_hits = scan_metrics['counters'].get('scan.split_hit', 0)
+    split_fallbacks = scan_metrics['counters'].get('scan.split_fallback', 0)
+    if split_hits or split_fallbacks:
+        print(f"✂️ Lectura por zonas: {split_hits} directas, {split_fallbacks} con barrido completo")
+    
+    choices_hits = scan_metrics['counters'].get('scan.choices_hit', 0)
+    choices_fallbacks = scan_metrics['counters'].get('scan.choices_fallback', 0)
+    if choices_hits or choices_fallbacks:
+        print(f"🔤 Lectura por alternativas: {choices_hits} directas, {choices_fallbacks} con barrido completo")
+    
+    ocr_calls = scan_metrics['observations'].get('scan_ocr_calls')
+    if ocr_calls:
+        print(f"🔁 Llamadas OCR por escaneo: {ocr_calls['avg']:.1f}")
+    
+    shared_frames = scan_metrics['counters'].get('ipc.frames_shared', 0)
+    if shared_frames:
+        avoided = scan_metrics['counters'].get('ipc.bytes_avoided', 0)
+        pickled = scan_metrics['counters'].get('ipc.frames_pickled', 0)
+        print(f"🔗 Frames por memoria compartida: {shared_frames} ({avoided / (1024 * 1024):.1f} MB sin copiar "
+              f"entre procesos), por pickle: {pickled}")
+    
+    stage_depths = {name.split('.')[1]: stats for name, stats in scan_metrics['observations'].items()
+                    if name.startswith('pipeline.') and name.endswith('.queue_depth')}
+    if stage_depths:
+        print("🏭 Cola promedio/máxima por etapa: " + ", ".join(
+            f"{name} {stats['avg']:.1f}/{stats['max']}" for name, stats in stage_depths.items()))
+    
+    peak = scan_metrics['observations'].get('scan_peak_bytes')
+    if peak:
+        print(f"💾 Memoria pico por escaneo: {peak['max'] / (1024 * 1024):.1f} MB")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
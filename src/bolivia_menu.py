@@ -4,7 +4,6 @@ Sistema interactivo de placas bolivianas - Menú principal
 """
 
 import os
-import cv2
 import datetime
 import re
 from pathlib import Path
@@ -13,8 +12,12 @@ from lib.filters import (
     thresholding,
     remove_noise,
     pytesseract,
-    detect_plate_contours
+    detect_plate_contours,
+    prepare_scaled_plate
 )
+from lib.plate_decoder import correct_ocr_errors
+from lib.image_loader import iter_image_files, load_image
+from lib.result_sink import RunSummary
 
 def normalize_bolivian_plate(plate_text):
     """Normaliza placa boliviana a formato consistente"""
@@ -52,56 +55,6 @@ def get_last_digit(plate_text):
     digits = re.findall(r'\d', plate_text)
     return int(digits[-1]) if digits else None
 
-def correct_ocr_errors(text):
-    """Corrige errores comunes de OCR en placas bolivianas"""
-    if not text:
-        return text
-    
-    # Correcciones específicas de OCR
-    corrections = {
-        'I': '1',  # I confundida con 1
-        'O': '0',  # O confundida con 0  
-        'S': '5',  # S confundida con 5 (en posición de número)
-        'G': '6',  # G confundida con 6 (en posición de número)
-        'B': '8',  # B confundida con 8 (en posición de número)
-        'Z': '2',  # Z confundida con 2 (en posición de número)
-    }
-    
-    result = text.upper()
-    
-    # Aplicar correcciones solo en las primeras 4 posiciones (números)
-    if len(result) >= 4:
-        # Corregir caracteres en posiciones de números (0-3)
-        number_part = result[:4]
-        letter_part = result[4:]
-        
-        corrected_numbers = ""
-        for char in number_part:
-            corrected_numbers += corrections.get(char, char)
-        
-        # Para las letras (posiciones 4-6), hacer correcciones inversas si es necesario
-        corrected_letters = ""
-        for char in letter_part:
-            # Corregir números que deberían ser letras
-            if char == '0':
-                corrected_letters += 'O'
-            elif char == '1':
-                corrected_letters += 'I'
-            elif char == '5':
-                corrected_letters += 'S'
-            elif char == '6':
-                corrected_letters += 'G'
-            elif char == '8':
-                corrected_letters += 'B'
-            elif char == '2':
-                corrected_letters += 'Z'
-            else:
-                corrected_letters += char
-        
-        result = corrected_numbers + corrected_letters
-    
-    return result
-
 def quick_plate_scan(image):
     """Escaneo de placa simplificado"""
     
@@ -113,17 +66,9 @@ def quick_plate_scan(image):
     processed = remove_noise(thresholding(gray))
     strategies.append(processed)
     
-    # 2. Imagen ampliada para mejorar detalles
-    try:
-        enlarged = cv2.resize(image, None, fx=2.0, fy=2.0, interpolation=cv2.INTER_CUBIC)
-        enlarged_gray = get_grayscale(enlarged)
-        enlarged_processed = remove_noise(thresholding(enlarged_gray))
-        strategies.append(enlarged_processed)
-    except:
-        pass
-    
-    # 3. Región detectada si es posible
+    # 2. Región detectada (o imagen completa) ampliada una sola vez al tamaño óptimo
     try:
+        crop_box = None
         plate_region = detect_plate_contours(image)
         if plate_region:
             x, y, w, h = plate_region
@@ -134,11 +79,11 @@ def quick_plate_scan(image):
             h_m = min(image.shape[0] - y_m, h + 2*margin)
             
             if w_m > 50 and h_m > 20:
-                cropped = image[y_m:y_m+h_m, x_m:x_m+w_m]
-                cropped_gray = get_grayscale(cropped)
-                cropped_processed = remove_noise(thresholding(cropped_gray))
-                strategies.append(cropped_processed)
-    except:
+                crop_box = (x_m, y_m, w_m, h_m)
+        
+        scaled_processed, _ = prepare_scaled_plate(gray, crop_box)
+        strategies.append(scaled_processed)
+    except Exception:
         pass
     
     # Configuraciones OCR optimizadas
@@ -267,34 +212,19 @@ def detect_plates():
     print("="*60)
     
     images_dir = Path("../images")
-    image_files = []
+    image_files = iter_image_files(images_dir)
     
-    for ext in ['.jpg', '.jpeg', '.png', '.JPG', '.JPEG', '.PNG']:
-        image_files.extend(images_dir.glob(f"*{ext}"))
+    print("\nProcesando imágenes...\n")
     
-    # Eliminar duplicados por nombre base
-    unique_files = {}
-    for img_path in image_files:
-        base_name = img_path.stem.lower()
-        if base_name not in unique_files:
-            unique_files[base_name] = img_path
-    
-    image_files = sorted(unique_files.values(), key=lambda x: x.name.lower())
-    
-    if not image_files:
-        print("\nNo se encontraron imágenes para procesar.")
-        return
-    
-    print(f"\nProcesando {len(image_files)} imágenes...\n")
-    
-    results = []
+    summary = RunSummary()
     
     for img_path in image_files:
+        summary.count_image()
         print(f"Imagen: {img_path.name}")
         
         try:
             # Cargar imagen
-            image = cv2.imread(str(img_path))
+            image = load_image(img_path)
             if image is None:
                 print("  Error: No se pudo cargar la imagen\n")
                 continue
@@ -331,7 +261,7 @@ def detect_plates():
             print(f"  Día: {day_msg}")
             print(f"  Horario: {time_msg}\n")
             
-            results.append({
+            summary.add({
                 'file': img_path.name,
                 'detected': detected_plate,
                 'normalized': normalized,
@@ -341,15 +271,19 @@ def detect_plates():
         except Exception as e:
             print(f"  Error: {e}\n")
     
+    if summary.total == 0:
+        print("No se encontraron imágenes para procesar.")
+        return
+    
     # Resumen final
-    if results:
+    if summary.detected:
         print("-" * 60)
         print("RESUMEN")
         print("-" * 60)
-        for r in results:
-            print(f"{r['file']}: {r['normalized']} -> {r['status']}")
+        for status, count in summary.status_counts.items():
+            print(f"{status}: {count}")
         
-        print(f"\nTotal procesadas: {len(results)}/{len(image_files)}")
+        print(f"\nTotal procesadas: {summary.detected}/{summary.total}")
     else:
         print("No se procesaron placas exitosamente.")
 
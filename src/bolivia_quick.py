@@ -4,7 +4,6 @@ Sistema de detección de placas bolivianas - Versión rápida y precisa
 """
 
 import os
-import cv2
 import datetime
 import re
 from pathlib import Path
@@ -13,8 +12,11 @@ from lib.filters import (
     thresholding,
     remove_noise,
     pytesseract,
-    detect_plate_contours
+    detect_plate_contours,
+    prepare_scaled_plate
 )
+from lib.image_loader import iter_image_files, load_image
+from lib.result_sink import RunSummary
 
 def normalize_bolivian_plate(plate_text):
     """Normaliza placa boliviana a formato consistente"""
@@ -67,17 +69,9 @@ def quick_ocr_scan(image):
     processed = remove_noise(thresholding(gray))
     strategies.append(("original", processed))
     
-    # 2. Imagen ampliada x2 para placas pequeñas o borrosas
-    try:
-        enlarged = cv2.resize(image, None, fx=2.0, fy=2.0, interpolation=cv2.INTER_CUBIC)
-        enlarged_gray = get_grayscale(enlarged)
-        enlarged_processed = remove_noise(thresholding(enlarged_gray))
-        strategies.append(("enlarged", enlarged_processed))
-    except:
-        pass
-    
-    # 3. Región de placa detectada (si es posible)
+    # 2. Región detectada (o imagen completa) ampliada una sola vez al tamaño óptimo
     try:
+        crop_box = None
         plate_region = detect_plate_contours(image)
         if plate_region:
             x, y, w, h = plate_region
@@ -88,11 +82,11 @@ def quick_ocr_scan(image):
             h_m = min(image.shape[0] - y_m, h + 2*margin)
             
             if w_m > 50 and h_m > 20:
-                cropped = image[y_m:y_m+h_m, x_m:x_m+w_m]
-                cropped_gray = get_grayscale(cropped)
-                cropped_processed = remove_noise(thresholding(cropped_gray))
-                strategies.append(("region", cropped_processed))
-    except:
+                crop_box = (x_m, y_m, w_m, h_m)
+        
+        scaled_processed, _ = prepare_scaled_plate(gray, crop_box)
+        strategies.append(("scaled", scaled_processed))
+    except Exception:
         pass
     
     print(f"  📊 Probando {len(strategies)} estrategias...")
@@ -145,10 +139,8 @@ def quick_ocr_scan(image):
                                 score += 15
                             
                             # Bonificaciones por estrategia
-                            if strategy_name == "region":
+                            if strategy_name == "scaled":
                                 score += 5
-                            elif strategy_name == "enlarged":
-                                score += 3
                             
                             # Penalizar caracteres confusos comunes en OCR
                             if 'I' in clean_line or 'O' in clean_line:
@@ -217,30 +209,19 @@ def main():
     print("="*60)
     
     images_dir = Path("../images")
-    image_files = []
-    
-    for ext in ['.jpg', '.jpeg', '.png', '.JPG', '.JPEG', '.PNG']:
-        image_files.extend(images_dir.glob(f"*{ext}"))
-    
-    # Eliminar duplicados por nombre base (evitar placa1.jpg y placa1.JPG)
-    unique_files = {}
-    for img_path in image_files:
-        base_name = img_path.stem.lower()
-        if base_name not in unique_files:
-            unique_files[base_name] = img_path
-    
-    image_files = sorted(unique_files.values(), key=lambda x: x.name.lower())
+    image_files = iter_image_files(images_dir)
     
-    print(f"🔍 Procesando {len(image_files)} imágenes...\n")
+    print("🔍 Procesando imágenes...\n")
     
-    results = []
+    summary = RunSummary()
     
     for img_path in image_files:
+        summary.count_image()
         print(f"📷 {img_path.name}")
         
         try:
             # Cargar imagen
-            image = cv2.imread(str(img_path))
+            image = load_image(img_path)
             if image is None:
                 print(f"  ❌ No se pudo cargar la imagen")
                 continue
@@ -273,7 +254,7 @@ def main():
             print(f"  📅 Día: {day_msg}")
             print(f"  🕐 Horario: {time_msg}\n")
             
-            results.append({
+            summary.add({
                 'file': img_path.name,
                 'detected': detected_plate,
                 'normalized': normalized,
@@ -284,13 +265,13 @@ def main():
             print(f"  ❌ Error: {e}\n")
     
     # Resumen
-    if results:
+    if summary.detected:
         print("                     RESUMEN FINAL")
         print("="*60)
-        for r in results:
-            print(f"📋 {r['file']}: {r['normalized']} → {r['status']}")
+        for status, count in summary.status_counts.items():
+            print(f"📋 {status}: {count}")
         
-        print(f"\n📊 Procesadas exitosamente: {len(results)}/{len(image_files)}")
+        print(f"\n📊 Procesadas exitosamente: {summary.detected}/{summary.total}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
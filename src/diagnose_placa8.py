@@ -3,10 +3,10 @@
 Diagnóstico específico para placa8.jpeg
 """
 
-import cv2
 import os
 from pathlib import Path
 from lib.filters import pytesseract, get_grayscale, thresholding, remove_noise
+from lib.image_loader import load_image
 
 def diagnose_placa8():
     """Diagnóstico detallado de placa8.jpeg"""
@@ -21,7 +21,7 @@ def diagnose_placa8():
     print("="*50)
     
     # Cargar imagen
-    image = cv2.imread(str(image_path))
+    image = load_image(image_path)
     if image is None:
         print("❌ No se pudo cargar la imagen")
         return
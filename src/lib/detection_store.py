@@ -0,0 +1,213 @@
+import datetime
+import queue
+import sqlite3
+import threading
+
+from lib.filters import normalize_plate_key
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS detections (
+    id INTEGER PRIMARY KEY,
+    plate TEXT NOT NULL,
+    detected_at INTEGER NOT NULL,
+    camera TEXT NOT NULL DEFAULT '',
+    restricted_time INTEGER NOT NULL DEFAULT 0,
+    status TEXT,
+    source TEXT,
+    raw_text TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_detections_plate_time ON detections (plate, detected_at);
+CREATE INDEX IF NOT EXISTS idx_detections_camera_time ON detections (camera, detected_at);
+CREATE INDEX IF NOT EXISTS idx_detections_time ON detections (detected_at);
+"""
+
+INSERT_SQL = """
+INSERT INTO detections (plate, detected_at, camera, restricted_time, status, source, raw_text)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+_STOP = object()
+
+
+def _to_epoch(value):
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        value = datetime.datetime.fromisoformat(value)
+    return int(value.timestamp())
+
+
+class DetectionStore:
+    """Historial de detecciones en SQLite (modo WAL) con índices por placa, fecha y cámara.
+
+    Las inserciones se encolan y un hilo escritor las confirma en grupo
+    (hasta `batch_size` filas por transacción), así el ciclo de reconocimiento
+    nunca espera al disco. Si una transacción falla, el escritor la registra y
+    sigue con las siguientes; flush() informa las filas perdidas. Las consultas
+    usan una conexión propia por hilo.
+    """
+
+    def __init__(self, path, batch_size=500, commit_interval=0.5):
+        self.path = str(path)
+        self.batch_size = batch_size
+        self.commit_interval = commit_interval
+        self._queue = queue.Queue()
+        self._local = threading.local()
+        self._lost = 0
+        self._error = None
+        self._error_lock = threading.Lock()
+
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        conn.commit()
+
+        self._writer = threading.Thread(target=self._write_loop, name='detection-store-writer', daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def _reader(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def _write_loop(self):
+        conn = self._connect()
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            rows = []
+            if item is _STOP:
+                stop = True
+            else:
+                rows.append(item)
+
+            # Agrupar todo lo que llegue durante commit_interval en una sola transacción
+            while not stop and len(rows) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=self.commit_interval)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                else:
+                    rows.append(item)
+
+            try:
+                if rows:
+                    with conn:
+                        conn.executemany(INSERT_SQL, rows)
+            except sqlite3.Error as e:
+                # Un error no detiene al escritor: flush() lo informa en vez de esperar para siempre
+                print(f"  ❌ No se guardaron {len(rows)} detecciones en {self.path}: {e}")
+                with self._error_lock:
+                    self._lost += len(rows)
+                    self._error = e
+            finally:
+                for _ in range(len(rows) + (1 if stop else 0)):
+                    self._queue.task_done()
+        conn.close()
+
+    def add(self, plate, detected_at=None, camera='', restricted_time=False, status=None, source=None, raw_text=None):
+        """Encola una detección (no bloquea)"""
+        if detected_at is None:
+            detected_at = datetime.datetime.now()
+        self._queue.put((
+            normalize_plate_key(plate),
+            _to_epoch(detected_at),
+            camera or '',
+            1 if restricted_time else 0,
+            status,
+            source,
+            raw_text,
+        ))
+
+    def add_result(self, result, camera=''):
+        """Encola un resultado de escaneo de los scripts bolivia_*"""
+        self.add(
+            result['normalized'],
+            detected_at=result.get('detected_at'),
+            camera=result.get('camera', camera),
+            restricted_time=result.get('time_restricted', False),
+            status=result.get('status'),
+            source=result.get('file'),
+            raw_text=result.get('detected'),
+        )
+
+    def flush(self):
+        """Espera a que todas las detecciones encoladas estén confirmadas.
+        Lanza RuntimeError si alguna transacción falló desde el último flush().
+        """
+        self._queue.join()
+        with self._error_lock:
+            lost, error = self._lost, self._error
+            self._lost, self._error = 0, None
+        if error is not None:
+            raise RuntimeError(f"No se guardaron {lost} detecciones: {error}") from error
+
+    def close(self):
+        self._queue.put(_STOP)
+        self._writer.join()
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def find_plate(self, plate, start=None, end=None, camera=None, restricted_only=False, limit=1000):
+        """Detecciones de una placa (más recientes primero), opcionalmente por rango, cámara y horario restringido"""
+        sql = "SELECT * FROM detections WHERE plate = ?"
+        params = [normalize_plate_key(plate)]
+        sql, params = self._add_filters(sql, params, start, end, camera, restricted_only)
+        sql += " ORDER BY detected_at DESC LIMIT ?"
+        params.append(limit)
+        return [self._row_to_dict(row) for row in self._reader().execute(sql, params)]
+
+    def detections_between(self, start, end, camera=None, restricted_only=False, limit=1000):
+        """Detecciones en un rango de fechas, opcionalmente de una cámara"""
+        sql, params = self._add_filters("SELECT * FROM detections WHERE 1 = 1", [], start, end, camera, restricted_only)
+        sql += " ORDER BY detected_at DESC LIMIT ?"
+        params.append(limit)
+        return [self._row_to_dict(row) for row in self._reader().execute(sql, params)]
+
+    def count_by_camera(self, start=None, end=None):
+        """Cantidad de detecciones por cámara en el rango indicado"""
+        sql, params = self._add_filters("SELECT camera, COUNT(*) FROM detections WHERE 1 = 1", [], start, end, None, False)
+        sql += " GROUP BY camera"
+        return dict(self._reader().execute(sql, params).fetchall())
+
+    @staticmethod
+    def _add_filters(sql, params, start, end, camera, restricted_only):
+        if start is not None:
+            sql += " AND detected_at >= ?"
+            params.append(_to_epoch(start))
+        if end is not None:
+            sql += " AND detected_at < ?"
+            params.append(_to_epoch(end))
+        if camera is not None:
+            sql += " AND camera = ?"
+            params.append(camera)
+        if restricted_only:
+            sql += " AND restricted_time = 1"
+        return sql, params
+
+    @staticmethod
+    def _row_to_dict(row):
+        record = dict(row)
+        record['detected_at'] = datetime.datetime.fromtimestamp(record['detected_at']).isoformat()
+        record['restricted_time'] = bool(record['restricted_time'])
+        return record
@@ -0,0 +1,90 @@
+import math
+import os
+from collections import namedtuple
+
+import cv2
+
+EXEC_MODES = ('latency', 'throughput', 'default')
+# Más hilos de OpenMP por proceso de Tesseract apenas aceleran una línea de texto
+MAX_OCR_THREADS = 4
+
+# mode: modo elegido; cpus: núcleos disponibles; workers: procesos o hilos de OCR en paralelo;
+# ocr_threads: OMP_THREAD_LIMIT de Tesseract; cv_threads: cv2.setNumThreads (None = sin cambiar)
+ExecConfig = namedtuple('ExecConfig', ['mode', 'cpus', 'workers', 'ocr_threads', 'cv_threads'])
+
+
+def _read_first_line(path):
+    try:
+        with open(path, encoding='ascii') as f:
+            return f.readline().strip()
+    except OSError:
+        return None
+
+
+def cgroup_cpu_limit():
+    """Núcleos que permite la cuota de CPU del cgroup (v2 o v1), o None si no hay cuota"""
+    # cgroup v2: "<cuota> <periodo>" o "max <periodo>"
+    line = _read_first_line('/sys/fs/cgroup/cpu.max')
+    if line:
+        quota, _, period = line.partition(' ')
+        if quota != 'max' and period:
+            return int(quota) / int(period)
+        return None
+
+    # cgroup v1: cuota -1 significa sin límite
+    for base in ('/sys/fs/cgroup/cpu', '/sys/fs/cgroup/cpu,cpuacct'):
+        quota = _read_first_line(f'{base}/cpu.cfs_quota_us')
+        period = _read_first_line(f'{base}/cpu.cfs_period_us')
+        if quota and period and int(quota) > 0:
+            return int(quota) / int(period)
+    return None
+
+
+def available_cpus():
+    """Núcleos utilizables: afinidad del proceso, acotada por la cuota del cgroup"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+
+    limit = cgroup_cpu_limit()
+    if limit is not None:
+        cpus = min(cpus, math.ceil(limit))
+    return max(cpus, 1)
+
+
+def plan(mode='latency', cpus=None):
+    """Elige la configuración de hilos para el modo indicado.
+
+    latency: una imagen a la vez; Tesseract y OpenCV reparten su trabajo entre los núcleos.
+    throughput: un trabajador por núcleo, cada uno con un solo hilo de Tesseract y de OpenCV,
+    para que N trabajadores no lancen N² hilos.
+    default: sin tocar la configuración de las bibliotecas (para comparar).
+    """
+    if mode not in EXEC_MODES:
+        raise ValueError(f"Modo de ejecución desconocido: {mode} (modos: {', '.join(EXEC_MODES)})")
+    cpus = cpus or available_cpus()
+
+    if mode == 'throughput':
+        return ExecConfig(mode, cpus, cpus, 1, 1)
+    if mode == 'latency':
+        return ExecConfig(mode, cpus, 1, min(cpus, MAX_OCR_THREADS), cpus)
+    return ExecConfig(mode, cpus, 1, None, None)
+
+
+def apply(config):
+    """Aplica la configuración al proceso actual. Los procesos de Tesseract heredan
+    OMP_THREAD_LIMIT del entorno; cv2.setNumThreads debe llamarse en cada proceso trabajador.
+    """
+    if config.ocr_threads is not None:
+        os.environ['OMP_THREAD_LIMIT'] = str(config.ocr_threads)
+    if config.cv_threads is not None:
+        cv2.setNumThreads(config.cv_threads)
+
+
+def with_workers(config, workers):
+    """La misma configuración con otra cantidad de trabajadores, repartiendo los núcleos entre ellos"""
+    if config.mode == 'default' or workers == config.workers:
+        return config._replace(workers=workers)
+    threads = max(config.cpus // workers, 1)
+    return config._replace(workers=workers, ocr_threads=min(threads, MAX_OCR_THREADS), cv_threads=threads)
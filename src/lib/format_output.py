@@ -135,16 +135,18 @@ def format_enhanced_output(results, output_config):
 
 
 def save_results_to_file(results, filename):
-    """Guarda los resultados en un archivo JSON"""
+    """Guarda los resultados en un archivo JSON escribiéndolos uno a uno.
+    `results` puede ser cualquier iterable (lista o generador).
+    """
     try:
-        output_data = {
-            'scan_date': datetime.datetime.now().isoformat(),
-            'total_images': len(results),
-            'results': results
-        }
-        
+        total = 0
         with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(output_data, f, indent=2, ensure_ascii=False)
+            f.write('{\n  "scan_date": %s,\n  "results": [' % json.dumps(datetime.datetime.now().isoformat()))
+            for result in results:
+                f.write(',\n    ' if total else '\n    ')
+                f.write(json.dumps(result, ensure_ascii=False))
+                total += 1
+            f.write('\n  ],\n  "total_images": %d\n}\n' % total)
         
         print(f"💾 Resultados guardados en: {filename}")
         
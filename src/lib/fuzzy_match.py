@@ -0,0 +1,120 @@
+from lib.filters import normalize_plate_key
+
+# Pares de caracteres que el OCR confunde (correct_ocr_errors y correct_placa8_chars)
+CONFUSION_PAIRS = [
+    ('I', '1'), ('O', '0'), ('S', '5'), ('G', '6'), ('B', '8'), ('Z', '2'),
+    ('A', '4'), ('L', '1'), ('R', 'F'),
+]
+
+# Costo de sustituir un carácter por otro confundible (el resto cuesta 1)
+CONFUSION_COST = 0.25
+
+
+def _confusion_classes(pairs):
+    """Agrupa los caracteres confundibles en clases y retorna carácter -> representante"""
+    parent = {}
+
+    def find(c):
+        parent.setdefault(c, c)
+        while parent[c] != c:
+            c = parent[c]
+        return c
+
+    for a, b in pairs:
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            parent[max(root_a, root_b)] = min(root_a, root_b)
+    return {c: find(c) for c in parent}
+
+
+_CLASS_OF = _confusion_classes(CONFUSION_PAIRS)
+_PAIR_COST = {}
+for _a, _b in CONFUSION_PAIRS:
+    _PAIR_COST[_a, _b] = _PAIR_COST[_b, _a] = CONFUSION_COST
+
+
+def canonical_form(text):
+    """Reemplaza cada carácter por el representante de su clase de confusión ('1O5' -> '105')"""
+    return ''.join(_CLASS_OF.get(c, c) for c in text)
+
+
+def substitution_cost(a, b):
+    if a == b:
+        return 0.0
+    return _PAIR_COST.get((a, b), 1.0)
+
+
+def weighted_edit_distance(a, b, max_distance=None):
+    """Distancia de edición donde sustituir caracteres confundibles cuesta CONFUSION_COST.
+    Con max_distance se abandona el cálculo (retorna inf) en cuanto se supera.
+    """
+    if max_distance is not None and abs(len(a) - len(b)) > max_distance:
+        return float('inf')
+
+    # Misma longitud: la suma de sustituciones es una cota superior barata
+    if len(a) == len(b):
+        hamming = sum(substitution_cost(ca, cb) for ca, cb in zip(a, b))
+        if hamming <= 1.0:
+            # Con a lo sumo una sustitución completa, ninguna inserción/eliminación la mejora
+            return hamming
+
+    previous = [float(j) for j in range(len(b) + 1)]
+    for i, ca in enumerate(a, 1):
+        current = [float(i)]
+        for j, cb in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1.0,
+                current[j - 1] + 1.0,
+                previous[j - 1] + (0.0 if ca == cb else _PAIR_COST.get((ca, cb), 1.0)),
+            ))
+        if max_distance is not None and min(current) > max_distance:
+            return float('inf')
+        previous = current
+    return previous[-1]
+
+
+def _deletion_keys(text):
+    """La forma canónica y todas sus variantes con un carácter eliminado"""
+    keys = {text}
+    for i in range(len(text)):
+        keys.add(text[:i] + text[i + 1:])
+    return keys
+
+
+class FuzzyPlateIndex:
+    """Índice de búsqueda aproximada de placas registradas tolerante a errores de OCR.
+
+    Cada placa se indexa por su forma canónica (caracteres confundibles
+    unificados) y por sus variantes con un carácter eliminado. Así una lectura
+    encuentra en pocas consultas a diccionario las placas que difieren en
+    cualquier número de confusiones típicas más una edición arbitraria; los
+    candidatos se ordenan con weighted_edit_distance.
+    """
+
+    def __init__(self, plates=()):
+        self._index = {}
+        for plate in plates:
+            self.add(plate)
+
+    def add(self, plate):
+        key = normalize_plate_key(plate)
+        for deletion in _deletion_keys(canonical_form(key)):
+            self._index.setdefault(deletion, set()).add(key)
+
+    def nearest(self, read, max_distance=1.0, limit=3):
+        """Retorna [(placa, distancia)] de las placas más cercanas a la lectura, hasta max_distance"""
+        read = normalize_plate_key(read)
+        if not read:
+            return []
+
+        candidates = set()
+        for deletion in _deletion_keys(canonical_form(read)):
+            candidates.update(self._index.get(deletion, ()))
+
+        matches = []
+        for plate in candidates:
+            distance = weighted_edit_distance(read, plate, max_distance)
+            if distance <= max_distance:
+                matches.append((plate, distance))
+        matches.sort(key=lambda match: (match[1], match[0]))
+        return matches[:limit]
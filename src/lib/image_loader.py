@@ -0,0 +1,156 @@
+import mmap
+import os
+import struct
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from lib.filters import detect_plate_contours
+
+# Extensiones de imagen aceptadas (sin distinguir mayúsculas)
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+# Lado mayor (px) a partir del cual la localización se hace a resolución reducida
+REDUCED_DECODE_MIN_SIDE = 2000
+
+# Banderas de decodificación directa a gris reducido
+REDUCED_GRAYSCALE_FLAGS = {
+    1: cv2.IMREAD_GRAYSCALE,
+    2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+}
+
+# Marcadores SOF de JPEG que contienen las dimensiones de la imagen
+_JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def iter_image_entries(directory, extensions=IMAGE_EXTENSIONS):
+    """Recorre el directorio con os.scandir y entrega las imágenes (os.DirEntry) a medida que aparecen.
+
+    La extensión se compara sin distinguir mayúsculas y se entrega sólo el
+    primer archivo de cada nombre base (placa1.jpg y placa1.JPG cuentan una vez).
+    El orden es el del sistema de archivos, no alfabético.
+    """
+    seen_stems = set()
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            stem, ext = os.path.splitext(entry.name)
+            if ext.lower() not in extensions:
+                continue
+            stem = stem.lower()
+            if stem in seen_stems or not entry.is_file():
+                continue
+            seen_stems.add(stem)
+            yield entry
+
+
+def iter_image_files(directory, extensions=IMAGE_EXTENSIONS):
+    """Igual que iter_image_entries pero entrega objetos Path"""
+    for entry in iter_image_entries(directory, extensions):
+        yield Path(entry.path)
+
+
+def decode_image(path, flags=cv2.IMREAD_COLOR):
+    """Decodifica una imagen leyendo el archivo con mmap + cv2.imdecode (sin copias intermedias)"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            buffer = np.frombuffer(mm, dtype=np.uint8)
+            try:
+                return cv2.imdecode(buffer, flags)
+            finally:
+                # Liberar la vista antes de cerrar el mmap
+                del buffer
+
+
+def read_image_size(path):
+    """Lee (ancho, alto) de la cabecera JPEG o PNG sin decodificar la imagen.
+    Retorna None si el formato no se reconoce.
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size < 24:
+            return None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # PNG: el chunk IHDR siempre va primero
+            if mm[:8] == b'\x89PNG\r\n\x1a\n':
+                width, height = struct.unpack('>II', mm[16:24])
+                return width, height
+
+            if mm[:2] != b'\xff\xd8':
+                return None
+
+            # JPEG: recorrer los segmentos hasta el marcador SOF
+            pos = 2
+            while pos + 9 < len(mm):
+                if mm[pos] != 0xFF:
+                    return None
+                marker = mm[pos + 1]
+                if marker == 0xFF:
+                    pos += 1
+                    continue
+                length = struct.unpack('>H', mm[pos + 2:pos + 4])[0]
+                if marker in _JPEG_SOF_MARKERS:
+                    height, width = struct.unpack('>HH', mm[pos + 5:pos + 9])
+                    return width, height
+                pos += 2 + length
+    return None
+
+
+def choose_reduction(size):
+    """Factor de reducción (1, 2 o 4) para localizar la placa en una imagen de tamaño (ancho, alto)"""
+    if not size:
+        return 1
+    longest = max(size)
+    reduction = 1
+    while reduction < 4 and longest / (reduction * 2) >= REDUCED_DECODE_MIN_SIDE / 2:
+        reduction *= 2
+    return reduction
+
+
+def load_image(path, grayscale=False, reduction=1):
+    """Carga una imagen a color, o en gris reducido 1/2/4 decodificando directamente a ese tamaño"""
+    if grayscale:
+        return decode_image(path, REDUCED_GRAYSCALE_FLAGS[reduction])
+    return decode_image(path, cv2.IMREAD_COLOR)
+
+
+def locate_plate(path, localizer=detect_plate_contours):
+    """Localiza la placa sobre la imagen decodificada en gris reducido.
+    Retorna la región (x, y, w, h) en coordenadas de resolución completa o None.
+    """
+    reduction = choose_reduction(read_image_size(path))
+    small = load_image(path, grayscale=True, reduction=reduction)
+    if small is None:
+        return None
+
+    region = localizer(small)
+    if not region:
+        return None
+
+    x, y, w, h = region
+    return x * reduction, y * reduction, w * reduction, h * reduction
+
+
+def load_plate_crop(path, margin=20):
+    """Carga sólo el recorte de la placa a resolución completa en imágenes grandes.
+
+    La placa se localiza en gris reducido; luego se decodifica la imagen
+    completa una vez, se copia el recorte con margen y se libera el resto.
+    En imágenes pequeñas (sin reducción) retorna la imagen completa.
+    Retorna (imagen, region) donde region es None si no se recortó.
+    """
+    if choose_reduction(read_image_size(path)) == 1:
+        return load_image(path), None
+
+    region = locate_plate(path)
+    image = load_image(path)
+    if image is None or region is None:
+        return image, None
+
+    x, y, w, h = region
+    x_m = max(0, x - margin)
+    y_m = max(0, y - margin)
+    crop = image[y_m:y + h + margin, x_m:x + w + margin].copy()
+    return crop, (x_m, y_m, crop.shape[1], crop.shape[0])
@@ -0,0 +1,82 @@
+import datetime
+import threading
+from collections import deque
+
+from lib import metrics
+from lib.filters import is_restricted_time
+
+# Perfiles de escaneo ordenados del más preciso al más rápido
+PROFILES = ['advanced', 'quick', 'single']
+
+
+class LoadShedder:
+    """Degrada el perfil de escaneo paso a paso cuando la cola de entrada se acumula.
+
+    advanced (barrido completo) -> quick (barrido reducido) -> single (una sola
+    configuración).
+    Sólo degrada dentro del horario de restricción (07:00-09:00 y 17:00-20:00)
+    salvo que only_restricted_hours sea False; fuera de ese horario se recupera.
+    """
+
+    def __init__(self, max_queue=50, max_latency=3.0, recover_queue=10,
+                 recover_latency=1.0, window=5, only_restricted_hours=True):
+        self.max_queue = max_queue
+        self.max_latency = max_latency
+        self.recover_queue = recover_queue
+        self.recover_latency = recover_latency
+        self.window = window
+        self.only_restricted_hours = only_restricted_hours
+        self.level = 0
+        self._latencies = deque(maxlen=window)
+        self._pressure_streak = 0
+        self._calm_streak = 0
+        # update() se llama desde varios hilos de OCR en el pipeline
+        self._lock = threading.Lock()
+
+    @property
+    def profile(self):
+        return PROFILES[self.level]
+
+    def update(self, queue_depth, latency=None, now=None):
+        """Registra el estado actual de la cola y retorna el perfil a usar"""
+        with self._lock:
+            return self._update(queue_depth, latency, now)
+
+    def _update(self, queue_depth, latency, now):
+        if latency is not None:
+            self._latencies.append(latency)
+            metrics.observe('scan_latency', latency)
+        metrics.observe('queue_depth', queue_depth)
+
+        avg_latency = sum(self._latencies) / len(self._latencies) if self._latencies else 0.0
+
+        active, _ = is_restricted_time(now or datetime.datetime.now())
+        if self.only_restricted_hours and not active:
+            pressure, calm = False, True
+        else:
+            pressure = queue_depth > self.max_queue or avg_latency > self.max_latency
+            calm = queue_depth <= self.recover_queue and avg_latency <= self.recover_latency
+
+        # Histéresis: se exigen `window` observaciones seguidas antes de cambiar de nivel
+        self._pressure_streak = self._pressure_streak + 1 if pressure else 0
+        self._calm_streak = self._calm_streak + 1 if calm else 0
+
+        if self._pressure_streak >= self.window and self.level < len(PROFILES) - 1:
+            self._change_level(self.level + 1, 'load_shed', queue_depth, avg_latency)
+        elif self._calm_streak >= self.window and self.level > 0:
+            self._change_level(self.level - 1, 'load_recover', queue_depth, avg_latency)
+
+        metrics.increment(f"profile.{self.profile}")
+        return self.profile
+
+    def _change_level(self, new_level, event, queue_depth, avg_latency):
+        metrics.record_event(
+            event,
+            from_profile=PROFILES[self.level],
+            to_profile=PROFILES[new_level],
+            queue_depth=queue_depth,
+            avg_latency=round(avg_latency, 3),
+        )
+        self.level = new_level
+        self._pressure_streak = 0
+        self._calm_streak = 0
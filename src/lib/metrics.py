@@ -0,0 +1,86 @@
+import datetime
+import threading
+from collections import deque
+
+# Métricas en memoria compartidas por los escáneres (contadores, observaciones y eventos)
+_lock = threading.Lock()
+_counters = {}
+_observations = {}
+_events = deque(maxlen=1000)
+
+
+def increment(name, value=1):
+    """Incrementa un contador"""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def observe(name, value):
+    """Registra una observación numérica (latencia, profundidad de cola, bytes...)"""
+    with _lock:
+        stats = _observations.get(name)
+        if stats is None:
+            stats = {'count': 0, 'total': 0, 'min': value, 'max': value, 'last': value}
+            _observations[name] = stats
+        stats['count'] += 1
+        stats['total'] += value
+        stats['min'] = min(stats['min'], value)
+        stats['max'] = max(stats['max'], value)
+        stats['last'] = value
+
+
+def record_event(name, **data):
+    """Registra un evento con marca de tiempo y cuenta cuántas veces ocurrió"""
+    event = {'event': name, 'time': datetime.datetime.now().isoformat()}
+    event.update(data)
+    with _lock:
+        _events.append(event)
+        key = f"events.{name}"
+        _counters[key] = _counters.get(key, 0) + 1
+
+
+def get_metrics():
+    """Retorna una copia de todas las métricas registradas"""
+    with _lock:
+        observations = {}
+        for name, stats in _observations.items():
+            observations[name] = dict(stats, avg=stats['total'] / stats['count'])
+        return {
+            'counters': dict(_counters),
+            'observations': observations,
+            'events': list(_events),
+        }
+
+
+def reset_metrics():
+    """Limpia todas las métricas"""
+    with _lock:
+        _counters.clear()
+        _observations.clear()
+        _events.clear()
+
+
+def take_metrics():
+    """Retorna los contadores y observaciones acumulados y los limpia (para enviarlos a otro proceso)"""
+    with _lock:
+        snapshot = {'counters': dict(_counters), 'observations': {name: dict(stats) for name, stats in _observations.items()}}
+        _counters.clear()
+        _observations.clear()
+    return snapshot
+
+
+def merge_metrics(snapshot):
+    """Suma a las métricas de este proceso las de take_metrics() en otro proceso"""
+    with _lock:
+        for name, value in snapshot['counters'].items():
+            _counters[name] = _counters.get(name, 0) + value
+        for name, other in snapshot['observations'].items():
+            stats = _observations.get(name)
+            if stats is None:
+                _observations[name] = dict(other)
+                continue
+            stats['count'] += other['count']
+            stats['total'] += other['total']
+            stats['min'] = min(stats['min'], other['min'])
+            stats['max'] = max(stats['max'], other['max'])
+            stats['last'] = other['last']
@@ -0,0 +1,147 @@
+import math
+from html.parser import HTMLParser
+
+from lib.filters import pytesseract
+from lib.plate_decoder import get_default_decoder
+
+# Una sola pasada LSTM que informa, por símbolo, las alternativas con su confianza
+CHOICES_CONFIG = (
+    '--psm 7 -c lstm_choice_mode=2 -c hocr_char_boxes=1 '
+    '-c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+)
+
+# Etiquetas sin cierre: no entran en la pila de clases
+VOID_TAGS = {'meta', 'link', 'br', 'img', 'hr'}
+
+# Confianza mínima (en %) que se asigna a una alternativa, para no anular log-probabilidades
+MIN_CHOICE_CONF = 0.5
+
+
+class _ChoicesParser(HTMLParser):
+    """Extrae del hOCR las alternativas de cada símbolo agrupadas por línea.
+
+    Con lstm_choice_mode=2 cada símbolo trae un <span class='ocr_glyph' title='x_confs N'>
+    por alternativa, dentro de un <span class='ocr_symbol'> (Tesseract 4.1) o de un
+    <span class='ocrx_cinfo' id='lstm_choices_...'> (Tesseract 5). Versiones que no
+    emiten alternativas dejan sólo <span class='ocrx_cinfo' title='...; x_conf N'>
+    con el carácter, que se usa como una única alternativa por símbolo.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+        self._stack = []
+        self._symbol = None
+        self._glyph = None
+        self._cinfo = None
+        # True si el ocrx_cinfo abierto agrupa las alternativas (no hay ocr_symbol)
+        self._cinfo_group = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_TAGS:
+            return
+        attrs = dict(attrs)
+        classes = (attrs.get('class') or '').split()
+        self._stack.append(classes)
+        if 'ocr_line' in classes or 'ocr_textfloat' in classes or 'ocr_header' in classes:
+            self.lines.append({'symbols': [], 'cinfo': []})
+        elif 'ocr_symbol' in classes:
+            self._symbol = []
+        elif 'ocr_glyph' in classes and self._symbol is not None:
+            self._glyph = ['', _title_value(attrs.get('title'), 'x_confs')]
+        elif 'ocrx_cinfo' in classes:
+            self._cinfo = ['', _title_value(attrs.get('title'), 'x_conf')]
+            if self._symbol is None:
+                self._symbol = []
+                self._cinfo_group = True
+
+    def handle_endtag(self, tag):
+        if tag in VOID_TAGS:
+            return
+        classes = self._stack.pop() if self._stack else []
+        if not self.lines:
+            return
+        line = self.lines[-1]
+        if 'ocr_glyph' in classes and self._glyph is not None:
+            if self._glyph[0]:
+                self._symbol.append(tuple(self._glyph))
+            self._glyph = None
+        elif 'ocr_symbol' in classes and self._symbol is not None:
+            if self._symbol:
+                line['symbols'].append(self._symbol)
+            self._symbol = None
+        elif 'ocrx_cinfo' in classes and self._cinfo is not None:
+            if self._cinfo_group and self._symbol:
+                line['symbols'].append(self._symbol)
+            elif self._cinfo[0]:
+                line['cinfo'].append([tuple(self._cinfo)])
+            if self._cinfo_group:
+                self._symbol = None
+                self._cinfo_group = False
+            self._cinfo = None
+
+    def handle_data(self, data):
+        if self._glyph is not None:
+            self._glyph[0] += data.strip()
+        elif self._cinfo is not None:
+            self._cinfo[0] += data.strip()
+
+
+def _title_value(title, key):
+    """Valor numérico de `key` en un atributo title de hOCR ('bbox 1 2 3 4; x_conf 96.1')"""
+    for part in (title or '').split(';'):
+        fields = part.split()
+        if len(fields) >= 2 and fields[0] == key:
+            try:
+                return float(fields[1])
+            except ValueError:
+                return None
+    return None
+
+
+def parse_hocr_choices(hocr):
+    """Convierte la salida hOCR en líneas de posiciones leídas.
+    Cada posición es una lista [(carácter, log-prob)] normalizada sobre sus alternativas.
+    """
+    if isinstance(hocr, bytes):
+        hocr = hocr.decode('utf-8', errors='replace')
+    parser = _ChoicesParser()
+    parser.feed(hocr)
+
+    lines = []
+    for line in parser.lines:
+        positions = []
+        for choices in line['symbols'] or line['cinfo']:
+            merged = {}
+            for text, conf in choices:
+                char = text.upper()
+                if len(char) != 1 or not char.isalnum():
+                    continue
+                conf = max(conf if conf is not None else 100.0, MIN_CHOICE_CONF)
+                merged[char] = merged.get(char, 0.0) + conf
+            if merged:
+                total = sum(merged.values())
+                positions.append([(char, math.log(conf / total)) for char, conf in merged.items()])
+        if positions:
+            lines.append(positions)
+    return lines
+
+
+def decode_hocr(hocr, decoder=None):
+    """Mejor placa válida entre todas las líneas del hOCR: (placa, log-verosimilitud) o None"""
+    decoder = decoder or get_default_decoder()
+    best = None
+    for positions in parse_hocr_choices(hocr):
+        decoded = decoder.decode_alternatives(positions)
+        if decoded and (best is None or decoded[1] > best[1]):
+            best = decoded
+    return best
+
+
+def read_plate_choices(image, decoder=None):
+    """Reconoce la placa con una sola llamada a Tesseract usando sus alternativas por carácter.
+    Retorna '1234ABC' o None.
+    """
+    hocr = pytesseract.image_to_pdf_or_hocr(image, extension='hocr', config=CHOICES_CONFIG)
+    decoded = decode_hocr(hocr, decoder)
+    return decoded[0] if decoded else None
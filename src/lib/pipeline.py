@@ -0,0 +1,150 @@
+import queue
+import threading
+import time
+
+from lib import metrics
+
+# Profundidad por defecto de la cola de entrada de cada etapa
+DEFAULT_QUEUE_SIZE = 8
+
+_DONE = object()
+
+
+class Stage:
+    """Etapa del pipeline: `func(item)` se aplica con `workers` hilos.
+    Lo que retorna func pasa a la etapa siguiente; None descarta el elemento.
+    """
+
+    def __init__(self, name, func, workers=1, queue_size=DEFAULT_QUEUE_SIZE):
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.queue_size = queue_size
+
+
+class StageError:
+    """Elemento que falló en una etapa: las etapas siguientes lo dejan pasar sin
+    procesarlo y sale del pipeline con el elemento tal como llegó a `stage`.
+    """
+
+    __slots__ = ('stage', 'item', 'error')
+
+    def __init__(self, stage, item, error):
+        self.stage = stage
+        self.item = item
+        self.error = error
+
+
+class Pipeline:
+    """Etapas conectadas por colas acotadas, cada una con su propio grupo de hilos.
+
+    Cuando una etapa se atrasa su cola de entrada se llena y la etapa anterior
+    se bloquea al intentar encolar: la contrapresión llega sola hasta la
+    lectura de imágenes. OpenCV y Tesseract (proceso aparte) liberan el GIL,
+    así que la lectura de disco y el reconocimiento se solapan.
+
+    Si una etapa lanza una excepción, el elemento sigue como StageError hasta la
+    salida: ningún elemento se pierde sin que el consumidor lo vea.
+
+    Cada etapa registra en lib.metrics la profundidad de su cola
+    (pipeline.<etapa>.queue_depth), el tiempo por elemento
+    (pipeline.<etapa>.seconds) y los errores (pipeline.<etapa>.errors).
+    """
+
+    def __init__(self, stages):
+        self.stages = stages
+        self._queues = []
+
+    def queue_depths(self):
+        """Profundidad actual de la cola de entrada de cada etapa"""
+        return {stage.name: q.qsize() for stage, q in zip(self.stages, self._queues)}
+
+    def run(self, items):
+        """Procesa `items` y genera lo que sale de la última etapa (sin garantizar el orden)"""
+        self._queues = [queue.Queue(maxsize=stage.queue_size) for stage in self.stages]
+        output = queue.Queue(maxsize=DEFAULT_QUEUE_SIZE)
+        stop = threading.Event()
+
+        threads = [threading.Thread(target=self._feed, args=(items, stop), name='pipeline-feed', daemon=True)]
+        for index, stage in enumerate(self.stages):
+            outbox = self._queues[index + 1] if index + 1 < len(self.stages) else output
+            remaining = [stage.workers]
+            lock = threading.Lock()
+            for n in range(stage.workers):
+                threads.append(threading.Thread(
+                    target=self._work,
+                    args=(stage, self._queues[index], outbox, remaining, lock),
+                    name=f'pipeline-{stage.name}-{n}',
+                    daemon=True,
+                ))
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                item = output.get()
+                if item is _DONE:
+                    break
+                yield item
+        finally:
+            # Si el consumidor abandona, dejar de leer entradas y vaciar las colas
+            stop.set()
+            for q in self._queues + [output]:
+                self._drain(q)
+            for thread in threads:
+                thread.join(timeout=1.0)
+
+    def _feed(self, items, stop):
+        inbox = self._queues[0]
+        try:
+            for item in items:
+                if stop.is_set():
+                    break
+                inbox.put(item)
+        finally:
+            for _ in range(self.stages[0].workers):
+                inbox.put(_DONE)
+
+    def _work(self, stage, inbox, outbox, remaining, lock):
+        depth_metric = f"pipeline.{stage.name}.queue_depth"
+        while True:
+            metrics.observe(depth_metric, inbox.qsize())
+            item = inbox.get()
+            if item is _DONE:
+                break
+            if isinstance(item, StageError):
+                outbox.put(item)
+                continue
+
+            start = time.perf_counter()
+            try:
+                result = stage.func(item)
+            except Exception as e:
+                metrics.increment(f"pipeline.{stage.name}.errors")
+                result = StageError(stage.name, item, e)
+            finally:
+                metrics.observe(f"pipeline.{stage.name}.seconds", time.perf_counter() - start)
+
+            if result is not None:
+                outbox.put(result)
+
+        # El último hilo de la etapa avisa el fin a todos los hilos de la siguiente
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            next_workers = self._next_workers(stage)
+            for _ in range(next_workers):
+                outbox.put(_DONE)
+
+    def _next_workers(self, stage):
+        index = self.stages.index(stage)
+        return self.stages[index + 1].workers if index + 1 < len(self.stages) else 1
+
+    @staticmethod
+    def _drain(q):
+        try:
+            while True:
+                q.get_nowait()
+        except queue.Empty:
+            pass
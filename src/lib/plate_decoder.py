@@ -0,0 +1,266 @@
+import csv
+import json
+import math
+import os
+import re
+
+DIGITS = '0123456789'
+LETTERS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+ALPHABET = DIGITS + LETTERS
+
+# Gramática de la placa boliviana estándar: 4 dígitos + 3 letras
+PLATE_GRAMMAR = [DIGITS] * 4 + [LETTERS] * 3
+
+# Confusiones conocidas entre clases (tablas de correct_ocr_errors y correct_placa8_chars)
+DIGIT_LETTER_CONFUSIONS = {
+    'I': '1', 'O': '0', 'S': '5', 'G': '6', 'B': '8', 'Z': '2', 'A': '4', 'L': '1',
+}
+LETTER_CONFUSIONS = [('R', 'F')]
+
+# Modelo entrenado por defecto (opcional)
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(__file__), 'plate_decoder_model.json')
+
+# Carácter leído por debajo de esta probabilidad: no se considera relacionado con el real
+MIN_CHAR_PROB = 1e-3
+# Máximo de caracteres espurios que se toleran en una lectura
+MAX_INSERTIONS = 2
+
+
+def correct_with_tables(text):
+    """Sustituciones fijas: letras -> dígitos en posiciones 0-3 y dígitos -> letras en 4-6"""
+    result = text.upper()
+
+    # Aplicar correcciones solo en las primeras 4 posiciones (números)
+    if len(result) >= 4:
+        letter_to_digit = {'I': '1', 'O': '0', 'S': '5', 'G': '6', 'B': '8', 'Z': '2'}
+        digit_to_letter = {digit: letter for letter, digit in letter_to_digit.items()}
+
+        corrected_numbers = ''.join(letter_to_digit.get(c, c) for c in result[:4])
+        # Para las letras (posiciones 4-6), hacer correcciones inversas
+        corrected_letters = ''.join(digit_to_letter.get(c, c) for c in result[4:])
+        result = corrected_numbers + corrected_letters
+
+    return result
+
+
+def correct_ocr_errors(text):
+    """Corrige errores comunes de OCR en placas bolivianas.
+
+    Usa el decodificador de máxima verosimilitud; si la lectura no se puede
+    llevar al formato 1234 ABC aplica las tablas fijas de sustitución.
+    """
+    if not text:
+        return text
+
+    decoded = get_default_decoder().decode(text)
+    if decoded:
+        return decoded[0]
+
+    return correct_with_tables(text)
+
+
+class PlateDecoder:
+    """Decodificador de placas por máxima verosimilitud con matriz de confusión aprendida.
+
+    Modela P(leído | real) por carácter, la probabilidad de caracteres espurios
+    y la distribución del carácter real en cada posición de la gramática
+    NNNN LLL. decode() elige, con programación dinámica, la placa válida más
+    probable dada la lectura del OCR.
+    """
+
+    def __init__(self, confusion=None, slot_counts=None, insertions=0, observed=0, smoothing=0.01):
+        # confusion[real][leído] = cantidad de veces observada
+        self.confusion = confusion or {}
+        # slot_counts[posición][real] = cantidad de veces observada
+        self.slot_counts = slot_counts or [{} for _ in PLATE_GRAMMAR]
+        self.insertions = insertions
+        self.observed = observed
+        self.smoothing = smoothing
+        self._prepare()
+
+    @classmethod
+    def from_tables(cls):
+        """Modelo inicial construido a partir de las tablas fijas de confusión"""
+        confusion = {c: {c: 100} for c in ALPHABET}
+        for letter, digit in DIGIT_LETTER_CONFUSIONS.items():
+            confusion[letter][digit] = confusion[letter].get(digit, 0) + 5
+            confusion[digit][letter] = confusion[digit].get(letter, 0) + 5
+        for a, b in LETTER_CONFUSIONS:
+            confusion[a][b] = 5
+            confusion[b][a] = 5
+        return cls(confusion, insertions=1, observed=100)
+
+    def train(self, pairs):
+        """Acumula estadísticas a partir de pares (placa real, lectura del OCR)"""
+        for truth, read in pairs:
+            truth = re.sub(r'[^A-Z0-9]', '', truth.upper())
+            read = re.sub(r'[^A-Z0-9]', '', read.upper())
+            if len(truth) != len(PLATE_GRAMMAR) or len(read) < len(truth):
+                continue
+
+            for slot, char in enumerate(truth):
+                self.slot_counts[slot][char] = self.slot_counts[slot].get(char, 0) + 1
+
+            for true_char, read_char in _align(truth, read):
+                self.observed += 1
+                if true_char is None:
+                    self.insertions += 1
+                    continue
+                row = self.confusion.setdefault(true_char, {})
+                row[read_char] = row.get(read_char, 0) + 1
+        self._prepare()
+        return self
+
+    def _prepare(self):
+        """Precalcula los logaritmos de emisión, priors por posición e inserción"""
+        size = len(ALPHABET)
+        self._log_emit = {}
+        self._emit = {}
+        for true_char in ALPHABET:
+            row = self.confusion.get(true_char, {})
+            total = sum(row.values()) + self.smoothing * size
+            probs = {c: (row.get(c, 0) + self.smoothing) / total for c in ALPHABET}
+            self._emit[true_char] = probs
+            self._log_emit[true_char] = {c: math.log(p) for c, p in probs.items()}
+
+        self._log_prior = []
+        for slot, allowed in enumerate(PLATE_GRAMMAR):
+            counts = self.slot_counts[slot]
+            total = sum(counts.get(c, 0) for c in allowed) + len(allowed)
+            self._log_prior.append({c: math.log((counts.get(c, 0) + 1) / total) for c in allowed})
+
+        self._log_insert = math.log((self.insertions + 1) / (self.observed + 2))
+
+    def best_char(self, slot, read_char):
+        """Carácter real más probable en la posición dada la lectura: (carácter, log-prob) o None"""
+        best = None
+        for true_char, log_prior in self._log_prior[slot].items():
+            if self._emit[true_char].get(read_char, 0.0) < MIN_CHAR_PROB:
+                continue
+            score = log_prior + self._log_emit[true_char][read_char]
+            if best is None or score > best[1]:
+                best = (true_char, score)
+        return best
+
+    def decode(self, text):
+        """Placa más probable bajo la gramática NNNN LLL: (placa, log-verosimilitud) o None"""
+        read = re.sub(r'[^A-Z0-9]', '', (text or '').upper())
+        slots = len(PLATE_GRAMMAR)
+        if not slots <= len(read) <= slots + MAX_INSERTIONS:
+            return None
+        return self._decode_slots([[(c, 0.0)] for c in read])
+
+    def decode_alternatives(self, alternatives):
+        """Como decode() pero cada posición leída trae varias alternativas [(carácter, log-prob OCR)]"""
+        slots = len(PLATE_GRAMMAR)
+        if not slots <= len(alternatives) <= slots + MAX_INSERTIONS:
+            return None
+        return self._decode_slots(alternatives)
+
+    def _decode_slots(self, observations):
+        """Programación dinámica: score[i][j] = mejor log-prob con i posiciones de placa y j lecturas"""
+        slots = len(PLATE_GRAMMAR)
+        count = len(observations)
+        neg_inf = float('-inf')
+        score = [[neg_inf] * (count + 1) for _ in range(slots + 1)]
+        back = [[None] * (count + 1) for _ in range(slots + 1)]
+        score[0][0] = 0.0
+
+        for i in range(slots + 1):
+            for j in range(count + 1):
+                current = score[i][j]
+                if current == neg_inf or j == count:
+                    continue
+
+                # Lectura espuria (ruido, borde de la placa)
+                if current + self._log_insert > score[i][j + 1]:
+                    score[i][j + 1] = current + self._log_insert
+                    back[i][j + 1] = (i, j, None)
+
+                # La lectura j corresponde a la posición i de la placa
+                if i < slots:
+                    best = None
+                    for read_char, ocr_log_prob in observations[j]:
+                        match = self.best_char(i, read_char)
+                        if match and (best is None or match[1] + ocr_log_prob > best[1]):
+                            best = (match[0], match[1] + ocr_log_prob)
+                    if best and current + best[1] > score[i + 1][j + 1]:
+                        score[i + 1][j + 1] = current + best[1]
+                        back[i + 1][j + 1] = (i, j, best[0])
+
+        if score[slots][count] == neg_inf:
+            return None
+
+        chars = []
+        i, j = slots, count
+        while i or j:
+            i, j, char = back[i][j]
+            if char is not None:
+                chars.append(char)
+        return ''.join(reversed(chars)), score[slots][count]
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'confusion': self.confusion,
+                'slot_counts': self.slot_counts,
+                'insertions': self.insertions,
+                'observed': self.observed,
+                'smoothing': self.smoothing,
+            }, f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data['confusion'], data['slot_counts'], data['insertions'], data['observed'], data['smoothing'])
+
+
+def _align(truth, read):
+    """Alinea la placa real con una lectura igual o más larga.
+    Retorna [(real o None si es espurio, leído)] con el mínimo de diferencias.
+    """
+    if len(truth) == len(read):
+        return list(zip(truth, read))
+
+    # cost[i][j]: diferencias alineando truth[:i] con read[:j] (sólo sustituciones e inserciones)
+    rows, cols = len(truth) + 1, len(read) + 1
+    cost = [[float('inf')] * cols for _ in range(rows)]
+    cost[0][0] = 0
+    for i in range(rows):
+        for j in range(1, cols):
+            insert = cost[i][j - 1] + 1
+            match = cost[i - 1][j - 1] + (truth[i - 1] != read[j - 1]) if i else float('inf')
+            cost[i][j] = min(insert, match)
+
+    pairs = []
+    i, j = len(truth), len(read)
+    while j:
+        if i and cost[i][j] == cost[i - 1][j - 1] + (truth[i - 1] != read[j - 1]):
+            pairs.append((truth[i - 1], read[j - 1]))
+            i -= 1
+        else:
+            pairs.append((None, read[j - 1]))
+        j -= 1
+    return list(reversed(pairs))
+
+
+def load_labeled_reads(path):
+    """Lee pares (placa real, lectura OCR) de un CSV con columnas truth,read"""
+    with open(path, newline='', encoding='utf-8') as f:
+        return [(row['truth'], row['read']) for row in csv.DictReader(f)]
+
+
+_default_decoder = None
+
+
+def get_default_decoder():
+    """Decodificador compartido: el modelo entrenado si existe, si no el de las tablas fijas"""
+    global _default_decoder
+    if _default_decoder is None:
+        model_path = os.environ.get('PLATE_DECODER_MODEL', DEFAULT_MODEL_PATH)
+        if os.path.exists(model_path):
+            _default_decoder = PlateDecoder.load(model_path)
+        else:
+            _default_decoder = PlateDecoder.from_tables()
+    return _default_decoder
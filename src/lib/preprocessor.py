@@ -0,0 +1,84 @@
+import cv2
+import numpy as np
+
+from lib.filters import CLOSE_KERNEL, MORPH_KERNEL, SKEW_TOLERANCE, camera_skew_angle, estimate_skew_angle
+
+
+class Preprocessor:
+    """Versión con estado de los filtros de lib.filters para procesar video.
+
+    Cada paso escribe en un búfer propio, reservado la primera vez que aparece
+    una combinación (paso, forma, dtype) y reutilizado en las siguientes
+    llamadas mediante el argumento dst= de OpenCV. Con frames de tamaño
+    constante el procesamiento en régimen no reserva memoria.
+
+    Las imágenes retornadas son esos búferes: se sobrescriben en la siguiente
+    llamada, así que hay que copiarlas si se necesitan después. Una instancia
+    no debe compartirse entre hilos.
+    """
+
+    def __init__(self):
+        self._buffers = {}
+
+    def _buffer(self, name, shape, dtype=np.uint8):
+        key = (name, shape, np.dtype(dtype))
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            buffer = self._buffers[key] = np.empty(shape, dtype)
+        return buffer
+
+    @property
+    def allocated_bytes(self):
+        """Memoria ocupada por los búferes reservados"""
+        return sum(buffer.nbytes for buffer in self._buffers.values())
+
+    def clear(self):
+        """Libera los búferes (p. ej. si cambió la resolución de la cámara)"""
+        self._buffers.clear()
+
+    def grayscale(self, image):
+        if len(image.shape) == 2:
+            return image
+        return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY, dst=self._buffer('gray', image.shape[:2]))
+
+    def thresholding(self, gray):
+        dst = self._buffer('threshold', gray.shape)
+        return cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU, dst=dst)[1]
+
+    def remove_noise(self, image):
+        return cv2.medianBlur(image, 5, dst=self._buffer('median', image.shape))
+
+    def opening(self, image):
+        return cv2.morphologyEx(image, cv2.MORPH_OPEN, MORPH_KERNEL, dst=self._buffer('opening', image.shape))
+
+    def process(self, image):
+        """Equivalente a remove_noise(thresholding(get_grayscale(image)))"""
+        return self.remove_noise(self.thresholding(self.grayscale(image)))
+
+    def correct_skew(self, gray, region=None, camera=None, tolerance=SKEW_TOLERANCE):
+        """Como lib.filters.correct_skew, rotando sobre un búfer reutilizable"""
+        roi = gray
+        if region is not None:
+            x, y, w, h = region
+            roi = gray[y:y + h, x:x + w]
+
+        angle = camera_skew_angle(camera, roi) if camera is not None else estimate_skew_angle(roi)
+        if angle is None or abs(angle) < tolerance:
+            return gray
+
+        h, w = gray.shape[:2]
+        rotation_matrix = cv2.getRotationMatrix2D((w // 2, h // 2), angle, 1.0)
+        return cv2.warpAffine(gray, rotation_matrix, (w, h), dst=self._buffer('deskew', gray.shape),
+                              flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+
+    def enhanced(self, image, region=None, camera=None):
+        """Equivalente a lib.filters.enhanced_preprocessing"""
+        gray = self.grayscale(image)
+        corrected = self.correct_skew(gray, region, camera)
+        shape = gray.shape
+
+        blurred = cv2.GaussianBlur(corrected, (3, 3), 0, dst=self._buffer('blur', shape))
+        equalized = cv2.equalizeHist(blurred, dst=self._buffer('equalize', shape))
+        adaptive = cv2.adaptiveThreshold(equalized, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY,
+                                         11, 2, dst=self._buffer('adaptive', shape))
+        return cv2.morphologyEx(adaptive, cv2.MORPH_CLOSE, CLOSE_KERNEL, dst=self._buffer('close', shape))
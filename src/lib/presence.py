@@ -0,0 +1,90 @@
+import cv2
+import numpy as np
+
+from lib import metrics
+
+# Ancho al que se reduce el frame antes de medir (el costo no depende de la resolución)
+PRESENCE_WIDTH = 320
+# Puntaje mínimo para considerar que el frame contiene una placa; 0 desactiva el filtro
+PRESENCE_THRESHOLD = 0.35
+
+# Valores de referencia: a partir de ellos cada señal aporta su peso completo
+EDGE_DENSITY_REF = 0.06
+PLATE_CONTOURS_REF = 3
+WHITE_FRACTION_REF = 0.15
+BLUE_FRACTION_REF = 0.02
+
+# Peso de cada señal en el puntaje (suman 1)
+PRESENCE_WEIGHTS = {'edges': 0.4, 'contours': 0.4, 'color': 0.2}
+
+# Fondo blanco y franja azul de las placas bolivianas en HSV de OpenCV (H de 0 a 180)
+WHITE_HSV = ((0, 0, 170), (180, 50, 255))
+BLUE_HSV = ((95, 80, 50), (130, 255, 255))
+
+
+def _downscale(image):
+    h, w = image.shape[:2]
+    if w <= PRESENCE_WIDTH:
+        return image
+    height = max(int(h * PRESENCE_WIDTH / w), 1)
+    return cv2.resize(image, (PRESENCE_WIDTH, height), interpolation=cv2.INTER_AREA)
+
+
+def count_plate_like_contours(edges):
+    """Contornos externos con proporciones de placa o de fila de caracteres"""
+    closed = cv2.morphologyEx(edges, cv2.MORPH_CLOSE, np.ones((3, 9), np.uint8))
+    contours, _ = cv2.findContours(closed, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    frame_area = edges.shape[0] * edges.shape[1]
+
+    count = 0
+    for contour in contours:
+        x, y, w, h = cv2.boundingRect(contour)
+        if h == 0:
+            continue
+        area = w * h
+        if 1.5 <= w / h <= 6.0 and 0.002 * frame_area <= area <= 0.95 * frame_area:
+            count += 1
+    return count
+
+
+def presence_features(image):
+    """Señales baratas de presencia de placa sobre el frame reducido"""
+    small = _downscale(image)
+    gray = small if len(small.shape) == 2 else cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    edges = cv2.Canny(gray, 100, 200)
+
+    features = {
+        'edge_density': cv2.countNonZero(edges) / edges.size,
+        'plate_contours': count_plate_like_contours(edges),
+        'white_fraction': 0.0,
+        'blue_fraction': 0.0,
+    }
+    if len(small.shape) == 3:
+        hsv = cv2.cvtColor(small, cv2.COLOR_BGR2HSV)
+        features['white_fraction'] = cv2.countNonZero(cv2.inRange(hsv, *WHITE_HSV)) / edges.size
+        features['blue_fraction'] = cv2.countNonZero(cv2.inRange(hsv, *BLUE_HSV)) / edges.size
+    return features
+
+
+def presence_score(features):
+    """Combina las señales en un puntaje entre 0 y 1"""
+    edges = min(features['edge_density'] / EDGE_DENSITY_REF, 1.0)
+    contours = min(features['plate_contours'] / PLATE_CONTOURS_REF, 1.0)
+    color = (min(features['white_fraction'] / WHITE_FRACTION_REF, 1.0)
+             + min(features['blue_fraction'] / BLUE_FRACTION_REF, 1.0)) / 2
+    return (PRESENCE_WEIGHTS['edges'] * edges
+            + PRESENCE_WEIGHTS['contours'] * contours
+            + PRESENCE_WEIGHTS['color'] * color)
+
+
+def has_plate(image, threshold=PRESENCE_THRESHOLD):
+    """Decide con el pre-filtro si vale la pena pasar el frame por OCR.
+    Cuenta presence.accepted / presence.rejected en lib.metrics.
+    """
+    if not threshold:
+        return True
+    score = presence_score(presence_features(image))
+    metrics.observe('presence_score', score)
+    present = score >= threshold
+    metrics.increment('presence.accepted' if present else 'presence.rejected')
+    return present
@@ -0,0 +1,99 @@
+import cv2
+import numpy as np
+
+from lib import metrics
+
+QUALITY_ROUTES = ('fast', 'enhance', 'reject')
+
+# La nitidez se mide con la fila de caracteres llevada a esta altura, para comparar placas de distinto tamaño
+QUALITY_HEIGHT = 64
+
+# Por debajo de estos valores no hay nada que el OCR pueda leer: se descarta sin escanear
+MIN_SHARPNESS = 40.0
+MIN_CONTRAST = 15.0
+MIN_PLATE_HEIGHT = 16
+# Brillo medio fuera de este rango: frame casi negro o quemado
+EXPOSURE_RANGE = (40.0, 220.0)
+# La saturación se mide por franjas verticales de la placa: una franja está perdida si
+# casi todos sus píxeles están saturados, es decir, si no le queda ni tinta ni fondo
+# sin saturar. El fondo blanco y nítido de una placa bien expuesta (o los caracteres
+# blancos de una placa azul) está saturado, pero sus franjas conservan los caracteres
+CLIP_STRIPS = 16
+CLIP_STRIP_SATURATION = 0.98
+# Fracción máxima de franjas perdidas (reflejos, frame quemado o negro)
+MAX_CLIPPED_FRACTION = 0.6
+
+# Muy borrosa a cualquier tamaño: va al realce de placas pequeñas y borrosas
+ENHANCE_SHARPNESS = 500.0
+ENHANCE_PLATE_HEIGHT = 60
+# Pequeña y borrosa a la vez (el caso de placa8.jpeg, sharpness 1857 y 78 px): también va al
+# realce. Una placa pequeña pero nítida (placa7, 3064 y 82 px) o borrosa pero grande (placa5,
+# 1180 y 109 px) se lee por el camino rápido
+SMALL_PLATE_HEIGHT = 96
+SMALL_PLATE_SHARPNESS = 2500.0
+
+
+def assess_quality(image, region=None):
+    """Puntajes de calidad de la placa localizada en `region` (x, y, w, h), o de la imagen completa.
+
+    sharpness: varianza del laplaciano a QUALITY_HEIGHT píxeles de alto.
+    contrast: desviación estándar del gris.
+    exposure: brillo medio; clipped: fracción de franjas verticales perdidas por saturación.
+    plate_height: alto en píxeles de la región localizada (la fila de caracteres) en la imagen
+    original; None si no se indicó la región, porque el alto del frame no dice nada de la placa.
+    """
+    plate_height = None
+    if region is not None:
+        x, y, w, h = region
+        image = image[y:y + h, x:x + w]
+        plate_height = image.shape[0]
+    gray = image if len(image.shape) == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+    scale = QUALITY_HEIGHT / max(gray.shape[0], 1)
+    interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+    normalized = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=interpolation)
+
+    mean, stddev = cv2.meanStdDev(gray)
+    # Fracción de píxeles saturados (negros o blancos) de cada columna, agrupada en franjas
+    saturated = ((gray < 16) | (gray >= 240)).mean(axis=0)
+    strips = [strip for strip in np.array_split(saturated, CLIP_STRIPS) if strip.size]
+    clipped = sum(strip.mean() >= CLIP_STRIP_SATURATION for strip in strips) / len(strips)
+
+    return {
+        'sharpness': round(float(cv2.Laplacian(normalized, cv2.CV_64F).var()), 1),
+        'contrast': round(float(stddev[0][0]), 1),
+        'exposure': round(float(mean[0][0]), 1),
+        'clipped': round(clipped, 3),
+        'plate_height': plate_height,
+    }
+
+
+def route_quality(scores):
+    """Elige el camino de la imagen según sus puntajes: 'fast', 'enhance' o 'reject'.
+    Las reglas de alto de placa sólo se aplican si la placa se localizó.
+    """
+    low, high = EXPOSURE_RANGE
+    plate_height = scores['plate_height']
+    if (scores['sharpness'] < MIN_SHARPNESS or scores['contrast'] < MIN_CONTRAST
+            or (plate_height is not None and plate_height < MIN_PLATE_HEIGHT)
+            or not low <= scores['exposure'] <= high or scores['clipped'] > MAX_CLIPPED_FRACTION):
+        return 'reject'
+    if scores['sharpness'] < ENHANCE_SHARPNESS:
+        return 'enhance'
+    if plate_height is not None and (plate_height < ENHANCE_PLATE_HEIGHT or (
+            plate_height < SMALL_PLATE_HEIGHT and scores['sharpness'] < SMALL_PLATE_SHARPNESS)):
+        return 'enhance'
+    return 'fast'
+
+
+def quality_gate(image, region=None):
+    """Evalúa la placa y decide su camino. Retorna los puntajes con la clave 'route'"""
+    scores = assess_quality(image, region)
+    scores['route'] = route_quality(scores)
+    return scores
+
+
+def record_quality(scores):
+    """Cuenta quality.<camino> en lib.metrics; llamar una vez por frame con los puntajes finales"""
+    metrics.increment(f"quality.{scores['route']}")
+    metrics.observe('quality_sharpness', scores['sharpness'])
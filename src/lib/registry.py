@@ -0,0 +1,198 @@
+import csv
+import datetime
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+from lib.filters import normalize_plate_key, normalize_plate_to_bolivian
+from lib.fuzzy_match import CONFUSION_COST, FuzzyPlateIndex
+
+AUTHORIZED = 'AUTHORIZED'
+EXPIRED = 'EXPIRED'
+NOT_AUTHORIZED = 'NOT AUTHORIZED'
+
+# Distancia máxima de una coincidencia aproximada aceptada: sólo confusiones típicas de OCR
+# (hasta dos), nunca una sustitución, inserción o eliminación arbitraria
+MAX_FUZZY_DISTANCE = 2 * CONFUSION_COST
+# Radio de búsqueda de candidatos que se informan sin autorizar
+CANDIDATE_DISTANCE = 1.0
+
+
+def registry_key(plate_text):
+    """Clave del índice: placa en orden 1234ABC (acepta también ABC1234 y separadores)"""
+    return normalize_plate_key(normalize_plate_to_bolivian(plate_text) or plate_text)
+
+
+def _parse_date(value):
+    """Convierte 'YYYY-MM-DD' a ordinal (0 = sin vencimiento)"""
+    if not value:
+        return 0
+    return datetime.date.fromisoformat(str(value).strip()[:10]).toordinal()
+
+
+class PlateRegistry:
+    """Registro de vehículos autorizados/exentos con índice hash en memoria.
+
+    Se carga desde un CSV (columnas plate, owner, vehicle_type, authorized_until)
+    o desde una base SQLite con esas columnas en la tabla `table`. Cada entrada
+    se guarda como una tupla (owner, vehicle_type, ordinal de vencimiento) bajo
+    la placa normalizada, así la búsqueda es O(1). El archivo se recarga en
+    caliente cuando cambia su mtime (revisado como mucho cada reload_interval s).
+    Con fuzzy=True, una lectura que no coincide exactamente se asocia a la placa
+    registrada más cercana según los errores típicos de OCR (hasta max_distance,
+    que debe ser menor que 1, y sin cambiar el dígito que define la restricción).
+    Las placas cercanas que no cumplen eso se informan como candidatas, no se autorizan.
+    """
+
+    def __init__(self, path, table='authorized_plates', reload_interval=5.0, fuzzy=True,
+                 max_distance=MAX_FUZZY_DISTANCE):
+        if max_distance >= 1.0:
+            raise ValueError("max_distance debe ser menor que 1 (sólo confusiones de OCR)")
+        self.path = str(path)
+        self.table = table
+        self.reload_interval = reload_interval
+        self.fuzzy = fuzzy
+        self.max_distance = max_distance
+        self._index = {}
+        self._fuzzy_index = None
+        self._mtime = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self.load()
+
+    def __len__(self):
+        return len(self._index)
+
+    def load(self):
+        """Carga (o recarga) el registro completo y reemplaza el índice de una vez"""
+        mtime = os.stat(self.path).st_mtime_ns
+        if self.path.endswith(('.db', '.sqlite', '.sqlite3')):
+            rows = self._read_sqlite()
+        else:
+            rows = self._read_csv()
+
+        index = {}
+        for plate, owner, vehicle_type, authorized_until in rows:
+            key = registry_key(plate)
+            if not key:
+                continue
+            # Los tipos de vehículo se repiten mucho: compartir una sola cadena
+            vehicle_type = sys.intern(vehicle_type or '')
+            index[key] = (owner or '', vehicle_type, _parse_date(authorized_until))
+
+        fuzzy_index = FuzzyPlateIndex(index) if self.fuzzy else None
+
+        with self._lock:
+            self._index = index
+            self._fuzzy_index = fuzzy_index
+            self._mtime = mtime
+
+    def _read_csv(self):
+        with open(self.path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                yield row.get('plate'), row.get('owner'), row.get('vehicle_type'), row.get('authorized_until')
+
+    def _read_sqlite(self):
+        conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        try:
+            query = f"SELECT plate, owner, vehicle_type, authorized_until FROM {self.table}"
+            for row in conn.execute(query):
+                yield row
+        finally:
+            conn.close()
+
+    def maybe_reload(self):
+        """Recarga el registro si el archivo cambió desde la última carga"""
+        now = time.monotonic()
+        if now - self._last_check < self.reload_interval:
+            return False
+        self._last_check = now
+        try:
+            if os.stat(self.path).st_mtime_ns == self._mtime:
+                return False
+            self.load()
+        except (OSError, ValueError, sqlite3.Error) as e:
+            # Mantener el índice anterior si el archivo nuevo está incompleto o no es válido
+            print(f"⚠️ No se pudo recargar el registro: {e}")
+            return False
+        return True
+
+    def match(self, plate_text):
+        """Busca la placa registrada que corresponde a la lectura.
+        Retorna (placa, distancia, entrada); distancia 0 si la coincidencia es exacta.
+        """
+        plate, distance, entry, _ = self._match(plate_text)
+        return plate, distance, entry
+
+    def _match(self, plate_text):
+        """Como match(), agregando la placa registrada más cercana que no se aceptó:
+        (placa, distancia, entrada, (candidata, distancia) o None)
+        """
+        index, fuzzy_index = self._index, self._fuzzy_index
+        key = registry_key(plate_text)
+        entry = index.get(key)
+        if entry is not None:
+            return key, 0.0, entry, None
+        if fuzzy_index is None or not key:
+            return None, None, None, None
+
+        matches = fuzzy_index.nearest(key, CANDIDATE_DISTANCE, limit=2)
+        if not matches:
+            return None, None, None, None
+        plate, distance = matches[0]
+        # Sólo aceptar confusiones de OCR, sin empate con otro candidato y con el mismo dígito
+        # de restricción: si no, podría tratarse de otro vehículo
+        unique = len(matches) == 1 or distance < matches[1][1]
+        same_digit = len(key) == len(plate) and key[3:4] == plate[3:4]
+        if distance <= self.max_distance and unique and same_digit:
+            return plate, distance, index[plate], None
+        return None, None, None, (plate, distance)
+
+    def lookup(self, plate_text):
+        """Retorna owner_info (owner, vehicle_type, authorized_until) o None"""
+        _, _, entry = self.match(plate_text)
+        return self._owner_info(entry) if entry else None
+
+    def check(self, plate_text, today=None):
+        """Retorna (estado, owner_info): AUTHORIZED, EXPIRED o NOT AUTHORIZED"""
+        status, owner_info, _, _, _ = self._check(plate_text, today)
+        return status, owner_info
+
+    def _check(self, plate_text, today=None):
+        self.maybe_reload()
+        plate, distance, entry, candidate = self._match(plate_text)
+        if entry is None:
+            return NOT_AUTHORIZED, None, None, None, candidate
+
+        until = entry[2]
+        today = (today or datetime.date.today()).toordinal()
+        if until and today > until:
+            return EXPIRED, self._owner_info(entry), plate, distance, None
+        return AUTHORIZED, self._owner_info(entry), plate, distance, None
+
+    @staticmethod
+    def _owner_info(entry):
+        owner, vehicle_type, until = entry
+        return {
+            'owner': owner,
+            'vehicle_type': vehicle_type,
+            'authorized_until': datetime.date.fromordinal(until).isoformat() if until else None,
+        }
+
+    def annotate(self, result, today=None):
+        """Completa 'authorization' y 'owner_info' en un resultado de escaneo.
+        Si la coincidencia fue aproximada agrega 'registry_plate' y 'match_distance'; si sólo
+        hubo una placa cercana no aceptada, 'registry_candidate' y 'match_distance'.
+        """
+        status, owner_info, plate, distance, candidate = self._check(
+            result.get('normalized') or result.get('detected'), today)
+        result['authorization'] = status
+        result['owner_info'] = owner_info
+        if candidate:
+            result['registry_candidate'], result['match_distance'] = candidate
+        elif distance:
+            result['registry_plate'] = plate
+            result['match_distance'] = distance
+        return result
@@ -0,0 +1,128 @@
+import csv
+import gzip
+import json
+import os
+import time
+
+
+# Columnas de los CSV de resultados, en orden. Las claves que no figuran aquí (o en la
+# cabecera de un archivo existente) se guardan como JSON en la columna 'extra'
+RESULT_FIELDS = [
+    'file', 'camera', 'detected', 'normalized', 'status', 'profile', 'detected_at', 'time_restricted',
+    'authorization', 'owner_info', 'registry_plate', 'registry_candidate', 'match_distance', 'quality',
+    'extra',
+]
+EXTRA_FIELD = 'extra'
+
+
+def _read_csv_header(path):
+    opener = gzip.open if path.endswith('.gz') else open
+    try:
+        with opener(path, 'rt', encoding='utf-8', newline='') as f:
+            return next(csv.reader(f), None)
+    except (OSError, EOFError):
+        return None
+
+
+class ResultWriter:
+    """Escritor incremental de resultados en JSONL o CSV.
+
+    El formato se elige por la extensión (.jsonl o .csv) y se comprime con gzip
+    si termina en .gz. En CSV las columnas son `fields` (por defecto RESULT_FIELDS) o,
+    al agregar a un archivo existente, su cabecera; las claves sin columna propia van
+    como JSON a la columna 'extra', y si el archivo no la tiene se lanza ValueError en
+    lugar de perderlas. Las escrituras pasan por un búfer que se vacía cada
+    `flush_every` resultados o `flush_interval` segundos, así una caída pierde
+    como mucho el último bloque.
+    """
+
+    def __init__(self, path, fields=None, flush_every=50, flush_interval=5.0):
+        self.path = str(path)
+        self.fields = fields
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.count = 0
+
+        name = self.path[:-3] if self.path.endswith('.gz') else self.path
+        self.format = 'csv' if name.endswith('.csv') else 'jsonl'
+
+        self._new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        if self.format == 'csv':
+            header = None if self._new_file else _read_csv_header(self.path)
+            if header and fields and list(fields) != header:
+                raise ValueError(f"Las columnas no coinciden con la cabecera de {self.path}: {header}")
+            self.fields = header or list(fields or RESULT_FIELDS)
+        if self.path.endswith('.gz'):
+            self._file = gzip.open(self.path, 'at', encoding='utf-8', newline='')
+        else:
+            self._file = open(self.path, 'a', encoding='utf-8', newline='', buffering=1024 * 1024)
+
+        self._csv = None
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    def write(self, result):
+        """Agrega un resultado al archivo"""
+        if self.format == 'csv':
+            if self._csv is None:
+                self._csv = csv.DictWriter(self._file, fieldnames=self.fields)
+                if self._new_file:
+                    self._csv.writeheader()
+            row = {}
+            extra = {}
+            for key, value in result.items():
+                if key in self.fields and key != EXTRA_FIELD:
+                    row[key] = json.dumps(value, ensure_ascii=False) if isinstance(value, (dict, list)) else value
+                else:
+                    extra[key] = value
+            if extra:
+                if EXTRA_FIELD not in self.fields:
+                    raise ValueError(f"{self.path} no tiene columna para: {', '.join(extra)}")
+                row[EXTRA_FIELD] = json.dumps(extra, ensure_ascii=False, default=str)
+            self._csv.writerow(row)
+        else:
+            self._file.write(json.dumps(result, ensure_ascii=False, default=str) + '\n')
+
+        self.count += 1
+        self._pending += 1
+        if self._pending >= self.flush_every or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Vacía el búfer al sistema operativo"""
+        self._file.flush()
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class RunSummary:
+    """Resumen de la ejecución calculado incrementalmente (memoria constante)"""
+
+    def __init__(self):
+        self.total = 0
+        self.detected = 0
+        self.status_counts = {}
+
+    def count_image(self):
+        """Registra una imagen leída, se haya detectado placa o no"""
+        self.total += 1
+
+    def add(self, result):
+        """Registra un resultado con placa detectada"""
+        self.detected += 1
+        status = result.get('status', 'N/A')
+        self.status_counts[status] = self.status_counts.get(status, 0) + 1
+
+    @property
+    def success_rate(self):
+        return self.detected * 100 / self.total if self.total else 0.0
@@ -0,0 +1,192 @@
+import datetime
+import threading
+import time
+from collections import deque
+
+from lib import metrics
+from lib.filters import is_restricted_time
+
+# Antigüedad máxima (s) de un frame en cola antes de descartarlo
+DEFAULT_MAX_AGE = 10.0
+# Frames en cola por cámara; al superarlo se descarta el más antiguo
+DEFAULT_MAX_QUEUE = 100
+# En horario de restricción, una cámara que sólo ve placas restringidas paga 1/RESTRICTED_BOOST
+# del costo por frame; el descuento es proporcional a su tasa reciente de placas restringidas
+RESTRICTED_BOOST = 2.0
+# Peso de cada nueva detección en la tasa de placas restringidas por cámara (media móvil)
+RESTRICTED_RATE_ALPHA = 0.2
+# Con menos de este margen (s) hasta su plazo, un frame pasa por delante del reparto justo
+URGENT_WINDOW = 0.5
+
+
+class _Frame:
+    __slots__ = ('item', 'deadline', 'finish')
+
+    def __init__(self, item, deadline, finish):
+        self.item = item
+        self.deadline = deadline
+        self.finish = finish
+
+
+class CameraScheduler:
+    """Planificador de colas justas ponderadas (WFQ) entre cámaras.
+
+    Cada cámara tiene su cola FIFO. Al encolar, el frame recibe una etiqueta de
+    fin virtual = max(tiempo virtual, última etiqueta de la cámara) + costo/peso,
+    y next() entrega el frame con la menor etiqueta: una cámara muy activa no
+    puede acaparar a los trabajadores, cada una avanza en proporción a su peso.
+    Para los frames capturados en horario de restricción, las cámaras que vienen
+    viendo placas restringidas (report_restricted) pagan menos por frame, hasta
+    1/`restricted_boost` del costo, y ganan prioridad sobre las demás. Un frame
+    cuyo plazo vence en menos de URGENT_WINDOW segundos pasa primero (el de
+    plazo más próximo), y uno con el plazo vencido se descarta sin procesar.
+
+    Los contadores por cámara se exportan en lib.metrics como
+    scheduler.<cámara>.submitted / processed / dropped_stale / dropped_overflow.
+    """
+
+    def __init__(self, weights=None, default_weight=1.0, max_age=DEFAULT_MAX_AGE,
+                 max_queue=DEFAULT_MAX_QUEUE, restricted_boost=RESTRICTED_BOOST, clock=time.monotonic):
+        self.weights = dict(weights or {})
+        self.default_weight = default_weight
+        self.max_age = max_age
+        self.max_queue = max_queue
+        self.restricted_boost = restricted_boost
+        self.clock = clock
+        self._queues = {}
+        self._last_finish = {}
+        self._counters = {}
+        self._restricted_rate = {}
+        self._virtual_time = 0.0
+        self._started = clock()
+        self._closed = False
+        self._dropped = []
+        self._condition = threading.Condition()
+
+    def _count(self, camera, name):
+        counters = self._counters.setdefault(camera, {})
+        counters[name] = counters.get(name, 0) + 1
+        metrics.increment(f"scheduler.{camera}.{name}")
+
+    def report_restricted(self, camera, restricted):
+        """Informa si el último frame procesado de la cámara tenía una placa restringida"""
+        with self._condition:
+            rate = self._restricted_rate.get(camera, 0.0)
+            self._restricted_rate[camera] = rate + RESTRICTED_RATE_ALPHA * (float(restricted) - rate)
+
+    def submit(self, camera, item, cost=1.0, deadline=None, captured_at=None):
+        """Encola un frame de la cámara. `deadline` es un plazo absoluto según `clock`
+        (por defecto, llegada + max_age) y `captured_at` la fecha de captura.
+        """
+        now = self.clock()
+        restricted, _ = is_restricted_time(captured_at or datetime.datetime.now())
+
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("El planificador está cerrado")
+            queue = self._queues.setdefault(camera, deque())
+            if len(queue) >= self.max_queue:
+                self._dropped.append((camera, queue.popleft().item))
+                self._count(camera, 'dropped_overflow')
+
+            if restricted:
+                rate = self._restricted_rate.get(camera, 0.0)
+                cost /= 1.0 + (self.restricted_boost - 1.0) * rate
+            weight = self.weights.get(camera, self.default_weight)
+            start = max(self._virtual_time, self._last_finish.get(camera, 0.0))
+            finish = start + cost / weight
+            self._last_finish[camera] = finish
+            queue.append(_Frame(item, deadline if deadline is not None else now + self.max_age, finish))
+            self._count(camera, 'submitted')
+            self._condition.notify()
+
+    def next(self, timeout=None):
+        """Espera y retorna el siguiente (cámara, item) a procesar; None si se cerró o venció el timeout"""
+        end = None if timeout is None else self.clock() + timeout
+        with self._condition:
+            while True:
+                choice = self._pick(self.clock())
+                if choice is not None:
+                    return choice
+                if self._closed:
+                    return None
+                remaining = None if end is None else end - self.clock()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._condition.wait(remaining)
+
+    def _pick(self, now):
+        best_camera = None
+        urgent_camera = None
+        for camera, queue in self._queues.items():
+            # Descartar los frames que ya no sirven (la escena pasó)
+            while queue and now > queue[0].deadline:
+                self._dropped.append((camera, queue.popleft().item))
+                self._count(camera, 'dropped_stale')
+            if not queue:
+                continue
+            head = queue[0]
+            if head.deadline - now < URGENT_WINDOW:
+                if urgent_camera is None or head.deadline < self._queues[urgent_camera][0].deadline:
+                    urgent_camera = camera
+            if best_camera is None or head.finish < self._queues[best_camera][0].finish:
+                best_camera = camera
+
+        camera = urgent_camera if urgent_camera is not None else best_camera
+        if camera is None:
+            return None
+        frame = self._queues[camera].popleft()
+        self._virtual_time = max(self._virtual_time, frame.finish)
+        self._count(camera, 'processed')
+        return camera, frame.item
+
+    def take_dropped(self):
+        """Retorna y olvida los (cámara, item) descartados desde la última llamada"""
+        with self._condition:
+            dropped, self._dropped = self._dropped, []
+        return dropped
+
+    def close(self):
+        """No acepta más frames; next() entrega lo que queda en cola y luego retorna None"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def queue_depths(self):
+        with self._condition:
+            return {camera: len(queue) for camera, queue in self._queues.items()}
+
+    def stats(self):
+        """Contadores por cámara y frames procesados por segundo desde la creación"""
+        elapsed = max(self.clock() - self._started, 1e-9)
+        with self._condition:
+            result = {}
+            for camera, counters in self._counters.items():
+                camera_stats = dict(counters)
+                camera_stats['queued'] = len(self._queues.get(camera, ()))
+                camera_stats['throughput'] = counters.get('processed', 0) / elapsed
+                camera_stats['restricted_rate'] = self._restricted_rate.get(camera, 0.0)
+                result[camera] = camera_stats
+            return result
+
+
+def run_workers(scheduler, handler, workers=1):
+    """Arranca `workers` hilos que toman frames del planificador y llaman handler(cámara, item).
+    Retorna los hilos; terminan cuando el planificador se cierra y su cola se vacía.
+    """
+    def work():
+        while True:
+            choice = scheduler.next()
+            if choice is None:
+                return
+            camera, item = choice
+            try:
+                handler(camera, item)
+            except Exception as e:
+                metrics.increment(f"scheduler.{camera}.errors")
+                print(f"  ❌ Error procesando {camera}: {e}")
+
+    threads = [threading.Thread(target=work, name=f'scheduler-worker-{n}', daemon=True) for n in range(workers)]
+    for thread in threads:
+        thread.start()
+    return threads
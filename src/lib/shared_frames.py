@@ -0,0 +1,127 @@
+import os
+import pickle
+from collections import deque, namedtuple
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from lib import metrics
+
+# Tamaño de cada ranura: alcanza para una imagen BGR de 5 megapíxeles
+DEFAULT_SLOT_BYTES = 16 * 1024 * 1024
+# Al dimensionar por el primer frame, margen para frames algo más grandes
+SLOT_HEADROOM = 2
+# Fracción de /dev/shm libre que puede ocupar un anillo (Docker trae 64 MB por defecto)
+SHM_BUDGET_FRACTION = 0.5
+
+# Lo único que viaja al proceso de OCR: bloque, ranura, posición, forma y tipo del frame
+FrameHandle = namedtuple('FrameHandle', ['ring', 'slot', 'offset', 'shape', 'dtype'])
+
+
+def _open_shared_memory(name):
+    try:
+        # Python 3.13+: el proceso que sólo se adjunta no debe liberar el bloque al salir
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+class FrameRing:
+    """Anillo de ranuras de tamaño fijo en memoria compartida para pasar frames entre procesos.
+
+    El proceso que decodifica escribe cada frame una sola vez con put() y envía
+    a los trabajadores sólo el FrameHandle; éstos leen el frame sin copiarlo con
+    frame_view(). La ranura vuelve a estar libre cuando el resultado regresa y
+    se llama a release(). Frames más grandes que una ranura se devuelven como
+    None en put() para que el llamador los envíe por pickle.
+    """
+
+    def __init__(self, slots=4, slot_bytes=DEFAULT_SLOT_BYTES):
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self._shm = shared_memory.SharedMemory(create=True, size=slots * slot_bytes)
+        self._free = deque(range(slots))
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    @property
+    def free_slots(self):
+        return len(self._free)
+
+    def put(self, frame):
+        """Copia el frame en una ranura libre. Retorna su FrameHandle, o None si no cabe"""
+        if frame.nbytes > self.slot_bytes:
+            metrics.increment('ipc.frames_pickled')
+            return None
+        if not self._free:
+            raise RuntimeError("No hay ranuras libres: liberar resultados antes de enviar más frames")
+
+        slot = self._free.popleft()
+        handle = FrameHandle(self.name, slot, slot * self.slot_bytes, frame.shape, frame.dtype.str)
+        view = np.ndarray(frame.shape, frame.dtype, buffer=self._shm.buf, offset=handle.offset)
+        view[...] = frame
+
+        metrics.increment('ipc.frames_shared')
+        metrics.increment('ipc.bytes_avoided', frame.nbytes - len(pickle.dumps(handle)))
+        return handle
+
+    def release(self, handle):
+        """Devuelve la ranura del frame al anillo"""
+        if handle is not None:
+            self._free.append(handle.slot)
+
+    def close(self):
+        """Libera la memoria compartida (sólo el proceso que creó el anillo)"""
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def shm_available(path='/dev/shm'):
+    """Bytes libres para memoria compartida, o None si no se puede saber"""
+    try:
+        stat = os.statvfs(path)
+    except (OSError, AttributeError):
+        return None
+    return stat.f_bavail * stat.f_frsize
+
+
+def ring_for_frame(frame, slots):
+    """Crea un anillo con ranuras del tamaño del frame (con margen, hasta DEFAULT_SLOT_BYTES)
+    y tantas como entren en SHM_BUDGET_FRACTION de /dev/shm, hasta `slots`.
+    Retorna None si no cabe ni una: los frames viajan por pickle.
+    """
+    slot_bytes = min(max(frame.nbytes * SLOT_HEADROOM, 1), DEFAULT_SLOT_BYTES)
+    available = shm_available()
+    if available is not None:
+        slots = min(slots, int(available * SHM_BUDGET_FRACTION) // slot_bytes)
+    if slots < 1:
+        return None
+    return FrameRing(slots, slot_bytes)
+
+
+# Bloques ya adjuntados en este proceso trabajador, por nombre
+_attached = {}
+
+
+def attach_ring(name):
+    """Adjunta el proceso actual al anillo (frame_view lo hace con el primer frame de cada anillo)"""
+    if name not in _attached:
+        _attached[name] = _open_shared_memory(name)
+
+
+def frame_view(frame):
+    """Frame listo para usar: vista sin copia si es un FrameHandle, o el propio array.
+    La vista sólo es válida hasta que el proceso principal libere la ranura.
+    """
+    if not isinstance(frame, FrameHandle):
+        return frame
+    attach_ring(frame.ring)
+    return np.ndarray(frame.shape, np.dtype(frame.dtype), buffer=_attached[frame.ring].buf, offset=frame.offset)
@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from lib.image_loader import iter_image_entries
+
+# Cada cuántos sondeos se lista el directorio aunque su mtime no haya cambiado
+# (detecta archivos sobrescritos en el mismo lugar)
+FULL_LISTING_EVERY = 30
+
+
+def file_digest(path, chunk_size=1024 * 1024):
+    """Hash SHA-1 del contenido del archivo, leído por bloques"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class CheckpointManifest:
+    """Manifiesto durable de imágenes procesadas: ruta -> tamaño, mtime y hash.
+
+    Se guarda como un diario JSONL donde cada línea se escribe con fsync, así
+    que tras una caída sólo se pierde, como mucho, la imagen en curso. Al abrir
+    se compacta el diario para que no crezca sin límite.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.entries = {}
+        self._load()
+        self._compact()
+        self._journal = open(self.path, 'a', encoding='utf-8')
+        # El sondeo y los trabajadores pueden marcar archivos desde hilos distintos
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Línea incompleta por una caída durante la escritura
+                    continue
+                self.entries[record['path']] = record
+
+    def _compact(self):
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for record in self.entries.values():
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def is_unchanged(self, path, size, mtime_ns):
+        """True si el archivo ya se procesó con el mismo tamaño y mtime"""
+        record = self.entries.get(str(path))
+        return record is not None and record['size'] == size and record['mtime_ns'] == mtime_ns
+
+    def has_digest(self, path, digest):
+        """True si el archivo ya se procesó con el mismo contenido"""
+        record = self.entries.get(str(path))
+        return record is not None and record['sha1'] == digest
+
+    def mark_processed(self, path, size, mtime_ns, digest):
+        """Registra el archivo como procesado y lo persiste en disco"""
+        record = {'path': str(path), 'size': size, 'mtime_ns': mtime_ns, 'sha1': digest}
+        with self._lock:
+            self.entries[record['path']] = record
+            self._journal.write(json.dumps(record, ensure_ascii=False) + '\n')
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+
+    def close(self):
+        with self._lock:
+            self._journal.close()
+
+
+def watch_for_changes(directory, manifest, interval=2.0, settle=1.0, stats=None):
+    """Sondea el directorio y entrega (ruta, tamaño, mtime_ns, hash) de imágenes nuevas o modificadas.
+
+    Sólo se lista el directorio cuando su mtime cambia (o cada FULL_LISTING_EVERY
+    sondeos), y sólo se calcula el hash de archivos cuyo tamaño o mtime difieren
+    del manifiesto. Los archivos modificados hace menos de `settle` segundos se
+    consideran en escritura y se revisan en el siguiente sondeo, igual que los que
+    desaparecen o no se pueden leer entre el listado y el hash.
+    Si se pasa `stats` (dict), stats['backlog'] es la cantidad de archivos del
+    listado actual que quedan por entregar después del que se entrega.
+    El llamador debe invocar manifest.mark_processed() tras procesar cada uno.
+    """
+    last_dir_mtime = None
+    polls = 0
+    pending = False
+
+    while True:
+        dir_mtime = os.stat(directory).st_mtime_ns
+        if dir_mtime != last_dir_mtime or pending or polls % FULL_LISTING_EVERY == 0:
+            last_dir_mtime = dir_mtime
+            pending = False
+            now_ns = time.time_ns()
+
+            # Primero sólo stat: los cambiados se cuentan antes de calcular hashes
+            changed = []
+            for entry in iter_image_entries(directory):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    # Rotado o borrado entre el listado y la lectura: se revisa en el siguiente sondeo
+                    pending = True
+                    continue
+                if manifest.is_unchanged(entry.path, stat.st_size, stat.st_mtime_ns):
+                    continue
+                if now_ns - stat.st_mtime_ns < settle * 1e9:
+                    pending = True
+                    continue
+                changed.append((entry.path, stat))
+
+            for index, (path, stat) in enumerate(changed):
+                try:
+                    digest = file_digest(path)
+                except OSError:
+                    pending = True
+                    continue
+
+                if manifest.has_digest(path, digest):
+                    # Sólo cambió el mtime: actualizar el manifiesto sin reprocesar
+                    manifest.mark_processed(path, stat.st_size, stat.st_mtime_ns, digest)
+                    continue
+
+                if stats is not None:
+                    stats['backlog'] = len(changed) - index - 1
+                yield Path(path), stat.st_size, stat.st_mtime_ns, digest
+
+        polls += 1
+        time.sleep(interval)
@@ -0,0 +1,116 @@
+import re
+
+import cv2
+import numpy as np
+
+from lib.filters import gray_region, pytesseract, TARGET_CHAR_HEIGHT
+
+# Placa boliviana estándar: 4 dígitos (zona izquierda) + 3 letras (zona derecha)
+DIGIT_CONFIG = '--psm 7 -c tessedit_char_whitelist=0123456789'
+LETTER_CONFIG = '--psm 7 -c tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+# Margen (en fracción de la altura del carácter) alrededor de cada zona
+ZONE_PADDING = 0.35
+
+
+def find_glyphs(gray):
+    """Cajas (x, y, w, h) de los caracteres de la fila principal de la placa, de izquierda a derecha"""
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    count, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+    if count <= 1:
+        return []
+
+    boxes = stats[1:, :4]
+    height = gray.shape[0]
+    y, w, h = boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    # Caracteres: altos respecto a la placa, más altos que anchos y sin tocar los bordes
+    mask = (h >= height * 0.3) & (h <= height * 0.95) & (w <= h * 1.2) & (w >= 2)
+    mask &= (y > 0) & (y + h < height)
+    glyphs = boxes[mask]
+    if len(glyphs) == 0:
+        return []
+
+    # Quedarse con la fila principal (excluye "BOLIVIA" y el texto del borde)
+    heights = glyphs[:, 3]
+    row_height = np.median(np.sort(heights)[-7:])
+    centers = glyphs[:, 1] + heights / 2
+    row_center = np.median(centers[heights >= row_height * 0.8])
+    in_row = (np.abs(centers - row_center) <= row_height * 0.5) & (heights >= row_height * 0.7)
+    glyphs = glyphs[in_row]
+    return [tuple(int(v) for v in box) for box in glyphs[np.argsort(glyphs[:, 0])]]
+
+
+def split_plate_zones(gray):
+    """Divide la placa en la zona de dígitos y la zona de letras.
+    Retorna (zona_digitos, zona_letras) binarizadas y escaladas a TARGET_CHAR_HEIGHT, o None si no hay fila de caracteres.
+    """
+    glyphs = find_glyphs(gray)
+    if len(glyphs) < 5:
+        return None
+
+    if len(glyphs) == 7:
+        split_index = 4
+    else:
+        # El mayor espacio entre caracteres separa los números de las letras
+        gaps = [glyphs[i + 1][0] - (glyphs[i][0] + glyphs[i][2]) for i in range(len(glyphs) - 1)]
+        split_index = int(np.argmax(gaps)) + 1
+
+    digits, letters = glyphs[:split_index], glyphs[split_index:]
+    if not digits or not letters:
+        return None
+
+    char_height = int(np.median([box[3] for box in glyphs]))
+    pad = max(2, int(char_height * ZONE_PADDING))
+    top = max(0, min(box[1] for box in glyphs) - pad)
+    bottom = min(gray.shape[0], max(box[1] + box[3] for box in glyphs) + pad)
+
+    # Cortar en el punto medio del espacio entre ambas zonas
+    split_x = (digits[-1][0] + digits[-1][2] + letters[0][0]) // 2
+    left = max(0, digits[0][0] - pad)
+    right = min(gray.shape[1], letters[-1][0] + letters[-1][2] + pad)
+
+    scale = TARGET_CHAR_HEIGHT / char_height
+    zones = []
+    for x0, x1 in ((left, split_x), (split_x, right)):
+        zone = gray[top:bottom, x0:x1]
+        if scale != 1.0:
+            interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_CUBIC
+            zone = cv2.resize(zone, None, fx=scale, fy=scale, interpolation=interpolation)
+        zones.append(cv2.threshold(zone, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)[1])
+    return zones[0], zones[1]
+
+
+def _read_zone(zone, config, pattern):
+    text = re.sub(r'[^A-Z0-9]', '', pytesseract.image_to_string(zone, config=config).upper())
+    # La zona debe contener exactamente los caracteres esperados
+    return text if re.fullmatch(pattern, text) else None
+
+
+def split_zone_ocr(image, region=None, stats=None):
+    """Lee la placa OCR-eando por separado la zona de dígitos y la de letras.
+
+    Las zonas se leen en el hilo del llamador: el paralelismo lo ponen los trabajadores
+    del pipeline, y las letras no se leen si los dígitos ya fallaron.
+
+    `region` (x, y, w, h) es la placa localizada, p. ej. por detect_plate_contours.
+    Si se pasa `stats` (dict), guarda en stats['ocr_calls'] las llamadas a Tesseract
+    realmente hechas: 0 si la placa no se pudo dividir, 1 si fallaron los dígitos.
+    Retorna '1234ABC' o None si la placa no se pudo dividir o alguna zona no se leyó completa.
+    """
+    if stats is not None:
+        stats['ocr_calls'] = 0
+    # Las zonas se llevan a TARGET_CHAR_HEIGHT: reducir un recorte enorme no pierde nada
+    gray, _ = gray_region(image, region)
+    zones = split_plate_zones(gray)
+    if zones is None:
+        return None
+
+    plate = ''
+    for zone, config, pattern in zip(zones, (DIGIT_CONFIG, LETTER_CONFIG), (r'\d{4}', r'[A-Z]{3}')):
+        if stats is not None:
+            stats['ocr_calls'] += 1
+        text = _read_zone(zone, config, pattern)
+        if text is None:
+            return None
+        plate += text
+    return plate
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Lectura de alternativas por carácter en el hOCR de Tesseract (lib.ocr_choices)
+"""
+
+from lib.ocr_choices import decode_hocr, parse_hocr_choices
+
+PLATE = '1234ABC'
+# Segunda alternativa de cada carácter: las confusiones típicas del OCR
+CONFUSIONS = {'1': 'I', '2': 'Z', '3': '8', '4': 'A', 'A': '4', 'B': '8', 'C': 'G'}
+
+
+def _page(line):
+    return ("<?xml version='1.0' encoding='UTF-8'?>\n<html><head><meta name='ocr-system' content='tesseract'/>"
+            "</head><body><div class='ocr_page' id='page_1'><span class='ocr_line' id='line_1_1'>"
+            f"<span class='ocrx_word' id='word_1_1'>{line}</span></span></div></body></html>")
+
+
+def _glyphs(i, char):
+    return (f"<span class='ocr_glyph' id='choice_1_{i}_1' title='x_confs 91'>{char}</span>"
+            f"<span class='ocr_glyph' id='choice_1_{i}_2' title='x_confs 9'>{CONFUSIONS[char]}</span>")
+
+
+def symbol_layout():
+    """Tesseract 4.1: alternativas dentro de ocr_symbol"""
+    return _page(''.join(f"<span class='ocr_symbol' id='symbol_1_{i}'>{_glyphs(i, char)}</span>"
+                         for i, char in enumerate(PLATE, 1)))
+
+
+def cinfo_layout(char_boxes=True):
+    """Tesseract 5: alternativas dentro de ocrx_cinfo id='lstm_choices_...', después de los
+    ocrx_cinfo con el carácter elegido si se pidió hocr_char_boxes=1"""
+    chars = ''.join(f"<span class='ocrx_cinfo' title='x_bboxes 0 0 9 9; x_conf 91'>{char}</span>"
+                    for char in PLATE) if char_boxes else ''
+    choices = ''.join(f"<span class='ocrx_cinfo' id='lstm_choices_1_1_{i}'>{_glyphs(i, char)}</span>"
+                      for i, char in enumerate(PLATE, 1))
+    return _page(chars + choices)
+
+
+def test_symbol_layout_keeps_alternatives():
+    positions, = parse_hocr_choices(symbol_layout())
+    assert len(positions) == len(PLATE)
+    assert all(len(choices) == 2 for choices in positions)
+    assert decode_hocr(symbol_layout())[0] == PLATE
+
+
+def test_cinfo_layout_keeps_alternatives():
+    for hocr in (cinfo_layout(), cinfo_layout(char_boxes=False)):
+        positions, = parse_hocr_choices(hocr)
+        assert [{char for char, _ in choices} for choices in positions] == [{c, CONFUSIONS[c]} for c in PLATE]
+        assert decode_hocr(hocr)[0] == PLATE
+
+
+def test_cinfo_without_choices_is_one_alternative():
+    hocr = _page(''.join(f"<span class='ocrx_cinfo' title='x_conf 80'>{char}</span>" for char in PLATE))
+    positions, = parse_hocr_choices(hocr)
+    assert [choices[0][0] for choices in positions] == list(PLATE)
+    assert decode_hocr(hocr)[0] == PLATE
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Errores por etapa en lib.pipeline: el elemento que falla sale del pipeline como StageError
+"""
+
+from lib.pipeline import Pipeline, Stage, StageError
+
+
+def _fail_on_three(value):
+    if value == 3:
+        raise ValueError("tres")
+    return value
+
+
+def test_failed_item_reaches_the_output():
+    seen = []
+    pipeline = Pipeline([
+        Stage('check', _fail_on_three, 2),
+        Stage('record', lambda value: seen.append(value) or value * 10, 1),
+    ])
+    outputs = list(pipeline.run(range(6)))
+
+    errors = [item for item in outputs if isinstance(item, StageError)]
+    assert len(outputs) == 6
+    assert [(error.stage, error.item, str(error.error)) for error in errors] == [('check', 3, 'tres')]
+    # Las etapas siguientes no procesan el elemento fallido
+    assert sorted(seen) == [0, 1, 2, 4, 5]
@@ -3,39 +3,9 @@
 Solución específica para placa8.jpeg y imágenes similares
 """
 
-import cv2
-import numpy as np
 from pathlib import Path
-from lib.filters import pytesseract, get_grayscale
-
-def enhance_small_plate_image(image):
-    """Mejora específica para imágenes pequeñas y borrosas"""
-    
-    # 1. Ampliar mucho más (4x en lugar de 2x)
-    enlarged = cv2.resize(image, None, fx=4.0, fy=4.0, interpolation=cv2.INTER_CUBIC)
-    
-    # 2. Convertir a gris
-    gray = cv2.cvtColor(enlarged, cv2.COLOR_BGR2GRAY) if len(enlarged.shape) == 3 else enlarged
-    
-    # 3. Ecualización de histograma para mejorar contraste
-    equalized = cv2.equalizeHist(gray)
-    
-    # 4. Filtro bilateral para reducir ruido manteniendo bordes
-    bilateral = cv2.bilateralFilter(equalized, 9, 75, 75)
-    
-    # 5. Sharpening (afilar imagen)
-    kernel = np.array([[-1,-1,-1], [-1,9,-1], [-1,-1,-1]])
-    sharpened = cv2.filter2D(bilateral, -1, kernel)
-    
-    # 6. Umbralización adaptativa
-    adaptive = cv2.adaptiveThreshold(sharpened, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
-                                   cv2.THRESH_BINARY, 11, 2)
-    
-    # 7. Operaciones morfológicas para limpiar
-    kernel = np.ones((2,2), np.uint8)
-    cleaned = cv2.morphologyEx(adaptive, cv2.MORPH_CLOSE, kernel)
-    
-    return cleaned
+from lib.filters import pytesseract, enhance_small_plate_image
+from lib.image_loader import load_image
 
 def correct_placa8_chars(text):
     """Correcciones específicas para los errores de placa8"""
@@ -69,7 +39,7 @@ def test_placa8_enhanced():
     print("="*50)
     
     # Cargar imagen
-    image = cv2.imread(str(image_path))
+    image = load_image(image_path)
     print(f"📏 Original: {image.shape[1]}x{image.shape[0]} píxeles")
     
     # Aplicar mejoras específicas
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Camino del filtro de calidad (lib.quality) para cada imagen de ejemplo
+"""
+
+from pathlib import Path
+
+from lib.image_loader import load_image
+from lib.localization import locate_plate
+from lib.quality import MAX_CLIPPED_FRACTION, quality_gate
+
+IMAGES_DIR = Path(__file__).resolve().parent.parent / 'images'
+
+# placa8 es pequeña y borrosa: el caso para el que se escribió el realce
+EXPECTED_ROUTES = {
+    'placa5.jpeg': 'fast',
+    'placa6.jpg': 'fast',
+    'placa7.jpeg': 'fast',
+    'placa8.jpeg': 'enhance',
+}
+
+
+def _gate(name):
+    """Puntajes sobre la misma región que usa scan_routed con el perfil avanzado"""
+    image = load_image(IMAGES_DIR / name)
+    region = locate_plate(image, 'glyphs')
+    return image, region, quality_gate(image, region)
+
+
+def test_sample_routes():
+    routes = {name: _gate(name)[2]['route'] for name in EXPECTED_ROUTES}
+    assert routes == EXPECTED_ROUTES
+
+
+def test_bright_plate_is_not_clipped():
+    # Fondo blanco nítido y saturado (placa6) o caracteres blancos sobre azul (placa7)
+    for name in ('placa6.jpg', 'placa7.jpeg'):
+        assert _gate(name)[2]['clipped'] < MAX_CLIPPED_FRACTION / 2
+
+
+def test_glare_is_rejected():
+    image, region, _ = _gate('placa6.jpg')
+    x, y, w, h = region
+    image[y:y + h, x:x + int(w * 0.7)] = 255
+    scores = quality_gate(image, region)
+    assert scores['clipped'] > MAX_CLIPPED_FRACTION
+    assert scores['route'] == 'reject'
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Factor de ampliación de prepare_scaled_plate (lib.filters) para cada imagen de ejemplo
+"""
+
+from pathlib import Path
+
+from lib.filters import estimate_char_size, gray_region, prepare_scaled_plate
+from lib.image_loader import load_image
+from lib.localization import locate_plate
+
+IMAGES_DIR = Path(__file__).resolve().parent.parent / 'images'
+
+
+def _plate(name):
+    """Imagen y región de la placa, como las recibe advanced_ocr_scan"""
+    image = load_image(IMAGES_DIR / name)
+    return image, locate_plate(image, 'glyphs')
+
+
+def test_placa8_is_upscaled():
+    # Caracteres de 55 px pero trazos de ~6 px: el trazo es el que limita
+    _, factor = prepare_scaled_plate(*_plate('placa8.jpeg'))
+    assert factor > 1.2
+
+
+def test_sharp_plates_keep_size():
+    for name in ('placa5.jpeg', 'placa6.jpg', 'placa7.jpeg'):
+        assert prepare_scaled_plate(*_plate(name))[1] == 1.0
+
+
+def test_light_glyphs_on_dark_plate():
+    # placa7 tiene caracteres blancos sobre azul: se mide la polaridad invertida
+    gray, _ = gray_region(*_plate('placa7.jpeg'))
+    height, _ = estimate_char_size(gray)
+    assert 55 <= height <= 70